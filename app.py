@@ -2,6 +2,7 @@ from flask import Flask, render_template, jsonify, request
 from datetime import datetime, timedelta
 import mysql.connector
 from typing import Dict, List
+import base64
 import json
 from dotenv import load_dotenv
 import os
@@ -26,11 +27,18 @@ def get_date_range() -> tuple:
         conn = mysql.connector.connect(**db_config)
         cursor = conn.cursor()
         
+        # Archived entries still count towards the browsable range
         query = """
             SELECT 
-                MIN(DATE(published)) as earliest_date,
-                MAX(DATE(published)) as latest_date
-            FROM entries
+                MIN(earliest_date) as earliest_date,
+                MAX(latest_date) as latest_date
+            FROM (
+                SELECT MIN(published_date) as earliest_date, MAX(published_date) as latest_date
+                FROM entries
+                UNION ALL
+                SELECT MIN(published_date), MAX(published_date)
+                FROM entries_archive
+            ) tiers
         """
         
         cursor.execute(query)
@@ -63,13 +71,17 @@ def get_summary(date: datetime.date) -> Dict:
         cursor = conn.cursor(dictionary=True)
         
         query = """
-            SELECT *
-            FROM daily_summaries
+            SELECT id, summary_date, summary_text, article_count, generated_at, publications, articles
+            FROM {table}
             WHERE summary_date = %s
         """
         
-        cursor.execute(query, (date,))
+        cursor.execute(query.format(table='daily_summaries'), (date,))
         result = cursor.fetchone()
+        if result is None:
+            # Read through to the cold tier for historical dates
+            cursor.execute(query.format(table='daily_summaries_archive'), (date,))
+            result = cursor.fetchone()
         
         if result:
             result['publications'] = json.loads(result['publications'])
@@ -110,17 +122,28 @@ def get_nearest_date(date):
         cursor = conn.cursor()
         
         query = """
-            SELECT summary_date 
-            FROM daily_summaries 
-            WHERE summary_date <= %s 
-            AND article_count > 0 
-            ORDER BY summary_date DESC 
-            LIMIT 1
+            SELECT MAX(summary_date) FROM (
+                (SELECT summary_date 
+                FROM daily_summaries 
+                WHERE summary_date <= %s 
+                AND article_count > 0 
+                ORDER BY summary_date DESC 
+                LIMIT 1)
+                UNION ALL
+                (SELECT summary_date 
+                FROM daily_summaries_archive 
+                WHERE summary_date <= %s 
+                AND article_count > 0 
+                ORDER BY summary_date DESC 
+                LIMIT 1)
+            ) nearest
         """
         
-        cursor.execute(query, (date,))
+        cursor.execute(query, (date, date))
         result = cursor.fetchone()
-        return jsonify({'nearest_date': result[0].isoformat() if result else None})
+        # MAX() over no rows still returns one row, holding NULL
+        nearest = result[0] if result else None
+        return jsonify({'nearest_date': nearest.isoformat() if nearest is not None else None})
         
     except Exception as e:
         print(f"Error finding nearest date: {e}")
@@ -137,6 +160,8 @@ def get_articles(date):
         conn = mysql.connector.connect(**db_config)
         cursor = conn.cursor(dictionary=True)
         
+        # Hot and archived rows for the day; each side is an index range
+        # scan on published_date, and the archive side is empty for recent days
         query = """
             SELECT 
                 e.id,
@@ -147,11 +172,22 @@ def get_articles(date):
                 e.summary,
                 e.author
             FROM entries e
-            WHERE DATE(e.published) = %s
-            ORDER BY e.published DESC
+            WHERE e.published_date = %s
+            UNION ALL
+            SELECT 
+                a.id,
+                a.title,
+                a.author as publication,
+                a.link,
+                a.published,
+                a.summary,
+                a.author
+            FROM entries_archive a
+            WHERE a.published_date = %s
+            ORDER BY published DESC
         """
         
-        cursor.execute(query, (date,))
+        cursor.execute(query, (date, date))
         articles = cursor.fetchall()
         
         return jsonify(articles)
@@ -164,6 +200,100 @@ def get_articles(date):
         cursor.close()
         conn.close()
 
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+
+def encode_search_cursor(score: float, entry_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, entry_id]).encode()).decode()
+
+def decode_search_cursor(cursor_token: str) -> tuple:
+    score, entry_id = json.loads(base64.urlsafe_b64decode(cursor_token.encode()))
+    return float(score), int(entry_id)
+
+def search_entries(query: str, start_date=None, end_date=None, feed_ids: List[int] = None,
+                   limit: int = SEARCH_PAGE_SIZE, after: tuple = None) -> List[Dict]:
+    """Full-text search over entry titles and summaries, best matches first.
+
+    Pages are keyed on (score, id) rather than OFFSET, so deep pages cost
+    the same as the first one.
+    """
+    conditions = ["MATCH(e.title, e.summary) AGAINST (%s IN NATURAL LANGUAGE MODE)", "e.is_duplicate = 0"]
+    params = [query, query]
+    if start_date:
+        conditions.append("e.published_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("e.published_date <= %s")
+        params.append(end_date)
+    if feed_ids:
+        conditions.append(f"e.feed_id IN ({', '.join(['%s'] * len(feed_ids))})")
+        params.extend(feed_ids)
+    if after:
+        conditions.append("""(
+            MATCH(e.title, e.summary) AGAINST (%s IN NATURAL LANGUAGE MODE) < %s
+            OR (MATCH(e.title, e.summary) AGAINST (%s IN NATURAL LANGUAGE MODE) = %s AND e.id < %s)
+        )""")
+        params.extend([query, after[0], query, after[0], after[1]])
+    params.append(limit)
+
+    try:
+        conn = mysql.connector.connect(**db_config)
+        cursor = conn.cursor(dictionary=True)
+        
+        cursor.execute(f"""
+            SELECT 
+                e.id,
+                e.title,
+                e.link,
+                e.published,
+                e.summary,
+                e.author,
+                f.title as publication,
+                MATCH(e.title, e.summary) AGAINST (%s IN NATURAL LANGUAGE MODE) as score
+            FROM entries e
+            LEFT JOIN feeds f ON e.feed_id = f.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY score DESC, e.id DESC
+            LIMIT %s
+        """, params)
+        return cursor.fetchall()
+        
+    finally:
+        if 'cursor' in locals():
+            cursor.close()
+        if 'conn' in locals() and conn.is_connected():
+            conn.close()
+
+@app.route('/api/search')
+def search_api():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'No query provided'}), 400
+
+    try:
+        start_date = request.args.get('start')
+        end_date = request.args.get('end')
+        start_date = datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None
+        end_date = datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+        feed_ids = [int(feed_id) for feed_id in request.args.getlist('feed_id')]
+        limit = min(max(int(request.args.get('limit', SEARCH_PAGE_SIZE)), 1), SEARCH_MAX_PAGE_SIZE)
+        after = request.args.get('cursor')
+        after = decode_search_cursor(after) if after else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid search parameters: {e}'}), 400
+
+    try:
+        results = search_entries(query, start_date, end_date, feed_ids, limit, after)
+    except Exception as e:
+        print(f"Search error: {e}")
+        return jsonify({'error': 'Search failed'}), 500
+
+    next_cursor = None
+    if len(results) == limit:
+        last = results[-1]
+        next_cursor = encode_search_cursor(last['score'], last['id'])
+    return jsonify({'results': results, 'next_cursor': next_cursor})
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     data = request.json
@@ -0,0 +1,97 @@
+"""Move old entries and daily summaries into the compressed archive tables.
+
+Rows older than ARCHIVE_AFTER_DAYS are copied to entries_archive and
+daily_summaries_archive, then deleted from the hot tables in the same
+transaction, one batch at a time. app.py reads through to the archive for
+historical dates, so the move is invisible to the API. The scrapers look up
+entries_archive.link_hash before inserting, so an archived link that a feed
+still lists isn't stored in the hot table again.
+"""
+import argparse
+import os
+from datetime import date, timedelta
+
+import mysql.connector
+from dotenv import load_dotenv
+
+ENTRY_COLUMNS = [
+    'id', 'feed_id', 'title', 'link', 'link_hash', 'published', 'published_date', 'author',
+    'entry_id', 'summary', 'publication', 'simhash', 'is_duplicate', 'created_at'
+]
+SUMMARY_COLUMNS = [
+    'id', 'summary_date', 'summary_text', 'article_count', 'generated_at', 'publications', 'articles'
+]
+
+# (hot table, archive table, date column, columns)
+TIERS = [
+    ('entries', 'entries_archive', 'published_date', ENTRY_COLUMNS),
+    ('daily_summaries', 'daily_summaries_archive', 'summary_date', SUMMARY_COLUMNS),
+]
+
+def archive_table(conn, table: str, archive: str, date_column: str, columns: list,
+                  cutoff: date, batch_size: int) -> int:
+    """Move rows dated before cutoff in batches, returning how many moved"""
+    column_list = ', '.join(columns)
+    cursor = conn.cursor()
+    moved = 0
+    try:
+        while True:
+            cursor.execute(f"""
+                SELECT id FROM {table}
+                WHERE {date_column} < %s
+                ORDER BY id
+                LIMIT %s
+            """, (cutoff, batch_size))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                return moved
+
+            placeholders = ', '.join(['%s'] * len(ids))
+            # REPLACE so a batch interrupted after the copy can simply be rerun
+            cursor.execute(f"""
+                REPLACE INTO {archive} ({column_list})
+                SELECT {column_list} FROM {table} WHERE id IN ({placeholders})
+            """, ids)
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", ids)
+            conn.commit()
+            moved += len(ids)
+            print(f"Archived {moved} rows from {table}...")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+def archive(db_config: dict, after_days: int, batch_size: int = 1000) -> int:
+    """Archive everything older than after_days, returning the number of rows moved"""
+    cutoff = date.today() - timedelta(days=after_days)
+    print(f"Archiving rows dated before {cutoff}")
+    conn = mysql.connector.connect(**db_config)
+    total = 0
+    try:
+        for table, archive_name, date_column, columns in TIERS:
+            moved = archive_table(conn, table, archive_name, date_column, columns, cutoff, batch_size)
+            print(f"{table}: {moved} rows archived")
+            total += moved
+        return total
+    finally:
+        conn.close()
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Move old rows into the compressed archive tables")
+    parser.add_argument('--after-days', type=int, default=int(os.getenv('ARCHIVE_AFTER_DAYS', 180)),
+                        help="Archive rows older than this many days")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    db_config = {
+        'host': os.getenv('DB_HOST', 'db'),
+        'user': os.getenv('DB_USER', 'rss_user'),
+        'password': os.getenv('DB_PASSWORD', 'rss_password'),
+        'database': os.getenv('DB_NAME', 'rss_feed')
+    }
+    archive(db_config, args.after_days, args.batch_size)
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,30 @@
-import pandas as pd
-from sqlalchemy import create_engine, text
+from __future__ import annotations
+
+from sqlalchemy import bindparam, create_engine, text
 import feedparser
 from datetime import datetime
+import csv
+import hashlib
+import json
 import logging
 import sys
 import os
 from os import getenv
 from dotenv import load_dotenv
 from urllib.parse import urlparse
-from typing import Optional
-import requests
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
 from requests.exceptions import RequestException
+from scraper_http import FeedHttpClient
+from fast_feed_parser import parse_feed
+from near_dup import SimHashIndex, simhash
+from date_parsing import FeedDateParser
+from link_key import link_hash, normalize_link
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +37,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# pandas is only needed for the DataFrame pipeline and CSV import
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+T = TypeVar('T')
+
+class EntryRecord(NamedTuple):
+    """A single feed entry on its way into the entries table"""
+    feed_id: int
+    title: str
+    link: str
+    published: Optional[datetime]
+    author: str
+    entry_id: str
+    summary: str
+    simhash: Optional[int] = None
+    is_duplicate: bool = False
+
 class FeedProcessor:
     def __init__(self):
         """Initialize database connection"""
@@ -32,7 +66,7 @@ class FeedProcessor:
                 f"mysql+mysqlconnector://"
                 f"{getenv('DB_USER', 'rss_user')}:"
                 f"{getenv('DB_PASSWORD', 'rss_password')}@"
-                f"{getenv('DB_HOST', 'db')}:3306/"  # Add explicit port
+                f"{getenv('DB_HOST', 'db')}:{getenv('DB_PORT', '3306')}/"
                 f"{getenv('DB_NAME', 'rss_feed')}"
             )
             
@@ -56,6 +90,53 @@ class FeedProcessor:
             self.max_summary_length = int(getenv('MAX_SUMMARY_LENGTH', 65535))
             self.feed_timeout = int(getenv('FEED_FETCH_TIMEOUT', 30))
             
+            # 'stream' writes bounded record batches, 'dataframe' uses pandas
+            self.pipeline = getenv('SCRAPER_PIPELINE', 'stream').lower()
+            if self.pipeline == 'dataframe' and pd is None:
+                logger.warning("pandas is not installed, falling back to the stream pipeline")
+                self.pipeline = 'stream'
+            
+            # Concurrent fetch settings (1 keeps the old sequential behaviour)
+            self.fetch_concurrency = max(1, int(getenv('FETCH_CONCURRENCY', 16)))
+            self.per_host_limit = max(1, int(getenv('FETCH_PER_HOST_LIMIT', 2)))
+            # Set while a pool thread's feed holds one of its host's fetch slots
+            self._local = threading.local()
+            
+            # Optional fast-path parser and process pool for feed parsing
+            self.fast_parser = getenv('FAST_FEED_PARSER', 'false').lower() in ('1', 'true', 'yes')
+            parse_processes = int(getenv('FEED_PARSE_PROCESSES', 0))
+            self.parse_pool = ProcessPoolExecutor(max_workers=parse_processes) if parse_processes > 0 else None
+            
+            # Cumulative seconds per pipeline stage (fetch, parse, transform, save)
+            self.stage_times: Dict[str, float] = defaultdict(float)
+            self._stage_lock = threading.Lock()
+            
+            # Shared keep-alive HTTP session sized to the per-host limit
+            self.http = FeedHttpClient(timeout=self.feed_timeout, pool_maxsize=self.per_host_limit)
+            
+            # Conditional GET validators (ETag / Last-Modified) per feed URL
+            self.conditional_get = getenv('CONDITIONAL_GET', 'true').lower() in ('1', 'true', 'yes')
+            self.validators = self._load_validators() if self.conditional_get else {}
+            self._pending_validators: Dict[str, Dict[str, Optional[str]]] = {}
+            self._validator_lock = threading.Lock()
+            
+            # Per-feed high-water marks so extraction stops at already-seen entries
+            self.incremental = getenv('INCREMENTAL_EXTRACTION', 'true').lower() in ('1', 'true', 'yes')
+            self.recent_id_limit = int(getenv('WATERMARK_RECENT_IDS', 200))
+            self.watermarks = self._load_watermarks() if self.incremental else {}
+            self._pending_watermarks: Dict[str, Dict] = {}
+            self._watermark_lock = threading.Lock()
+            
+            # Cross-feed near-duplicate detection: 'tag', 'collapse' or 'off'
+            self.near_dup_mode = getenv('NEAR_DUP_MODE', 'tag').lower()
+            self.near_dup_index = None
+            if self.near_dup_mode in ('tag', 'collapse'):
+                self.near_dup_index = SimHashIndex(
+                    max_distance=int(getenv('NEAR_DUP_DISTANCE', 3)),
+                    window_seconds=float(getenv('NEAR_DUP_WINDOW_DAYS', 3)) * 86400
+                )
+                self._load_fingerprints()
+            
         except Exception as e:
             logger.error(f"Database connection error: {type(e).__name__}")
             logger.debug(f"Detailed error: {str(e)}")
@@ -88,12 +169,6 @@ class FeedProcessor:
             df = pd.read_csv(csv_path)
             logger.info(f"Found {len(df)} feeds in CSV file")
 
-            # Add headers for request
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/rss+xml, application/xml, application/atom+xml, text/xml;q=0.9, */*;q=0.8'
-            }
-
             # Get feed titles using feedparser
             feed_data = []
             for feed_url in df['feed_url']:
@@ -104,10 +179,10 @@ class FeedProcessor:
                 try:
                     logger.info(f"Fetching title for {feed_url}")
                     
-                    # Fetch feed content with timeout
-                    response = requests.get(feed_url, headers=headers, timeout=self.feed_timeout)
-                    response.raise_for_status()
-                    feed = feedparser.parse(response.content)
+                    # Fetch feed content with timeout, unconditionally: a 304
+                    # here would leave a fresh database without the feed row
+                    content, _ = self._fetch_feed(feed_url, conditional=False)
+                    feed = feedparser.parse(content)
                     
                     title = self.safe_truncate(feed.feed.get('title', feed_url), 255)
                     
@@ -176,32 +251,396 @@ class FeedProcessor:
             logger.debug(f"Detailed error: {str(e)}")
             return pd.DataFrame()
 
+    def get_feed_list(self) -> List[Tuple[int, str]]:
+        """Get (id, feed_url) pairs from the CSV file without pandas"""
+        try:
+            csv_path = os.path.join(os.path.dirname(__file__), 'feeds.csv')
+            if not os.path.exists(csv_path):
+                logger.error(f"CSV file not found: {csv_path}")
+                return []
+
+            with open(csv_path, newline='', encoding='utf-8') as f:
+                feeds = [
+                    (feed_id, row['feed_url'].strip())
+                    for feed_id, row in enumerate(csv.DictReader(f), start=1)
+                    if row.get('feed_url')
+                ]
+            logger.info(f"Retrieved {len(feeds)} feeds from CSV file")
+            return feeds
+            
+        except Exception as e:
+            logger.error(f"Error reading feeds CSV: {type(e).__name__}")
+            logger.debug(f"Detailed error: {str(e)}")
+            return []
+
+    def _load_validators(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """Load stored ETag / Last-Modified validators keyed by feed URL"""
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    text("SELECT feed_url, etag, last_modified FROM feed_validators")
+                ).fetchall()
+            logger.info(f"Loaded validators for {len(rows)} feeds")
+            return {
+                row.feed_url: {'etag': row.etag, 'last_modified': row.last_modified}
+                for row in rows
+            }
+        except Exception as e:
+            logger.warning(f"Could not load feed validators: {type(e).__name__}")
+            logger.debug(f"Detailed error: {str(e)}")
+            return {}
+
+    def save_validators(self) -> None:
+        """Persist validators collected during this run"""
+        with self._validator_lock:
+            pending = self._pending_validators
+            self._pending_validators = {}
+        if not pending:
+            return
+
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text("""
+                        INSERT INTO feed_validators (feed_url, etag, last_modified)
+                        VALUES (:feed_url, :etag, :last_modified)
+                        ON DUPLICATE KEY UPDATE
+                        etag = VALUES(etag),
+                        last_modified = VALUES(last_modified)
+                    """),
+                    [
+                        {'feed_url': url, 'etag': v['etag'], 'last_modified': v['last_modified']}
+                        for url, v in pending.items()
+                    ]
+                )
+            self.validators.update(pending)
+            logger.info(f"Saved validators for {len(pending)} feeds")
+        except Exception as e:
+            logger.error(f"Validator save error: {type(e).__name__}")
+            logger.debug(f"Detailed error: {str(e)}")
+
+    def _load_watermarks(self) -> Dict[str, Dict]:
+        """Load each feed's newest published date and recently seen entry keys"""
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    text("SELECT feed_url, last_published, recent_ids FROM feed_watermarks")
+                ).fetchall()
+            logger.info(f"Loaded high-water marks for {len(rows)} feeds")
+            return {
+                row.feed_url: {
+                    'last_published': row.last_published,
+                    'recent_ids': json.loads(row.recent_ids) if row.recent_ids else []
+                }
+                for row in rows
+            }
+        except Exception as e:
+            logger.warning(f"Could not load feed high-water marks: {type(e).__name__}")
+            logger.debug(f"Detailed error: {str(e)}")
+            return {}
+
+    def save_watermarks(self) -> None:
+        """Persist high-water marks and skip statistics collected during this run"""
+        with self._watermark_lock:
+            pending = self._pending_watermarks
+            self._pending_watermarks = {}
+        if not pending:
+            return
+
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text("""
+                        INSERT INTO feed_watermarks
+                            (feed_url, last_published, recent_ids, entries_seen, entries_skipped)
+                        VALUES (:feed_url, :last_published, :recent_ids, :entries_seen, :entries_skipped)
+                        ON DUPLICATE KEY UPDATE
+                        last_published = VALUES(last_published),
+                        recent_ids = VALUES(recent_ids),
+                        entries_seen = entries_seen + VALUES(entries_seen),
+                        entries_skipped = entries_skipped + VALUES(entries_skipped)
+                    """),
+                    [
+                        {
+                            'feed_url': url,
+                            'last_published': mark['last_published'],
+                            'recent_ids': json.dumps(mark['recent_ids']),
+                            'entries_seen': mark['entries_seen'],
+                            'entries_skipped': mark['entries_skipped']
+                        }
+                        for url, mark in pending.items()
+                    ]
+                )
+            for url, mark in pending.items():
+                self.watermarks[url] = {
+                    'last_published': mark['last_published'],
+                    'recent_ids': mark['recent_ids']
+                }
+            seen = sum(mark['entries_seen'] for mark in pending.values())
+            skipped = sum(mark['entries_skipped'] for mark in pending.values())
+            logger.info(
+                f"Saved high-water marks for {len(pending)} feeds "
+                f"(skipped {skipped}/{seen} already-seen entries)"
+            )
+        except Exception as e:
+            logger.error(f"High-water mark save error: {type(e).__name__}")
+            logger.debug(f"Detailed error: {str(e)}")
+
+    def _load_fingerprints(self) -> None:
+        """Warm the near-duplicate index with fingerprints ingested inside the window"""
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    text("""
+                        SELECT simhash, UNIX_TIMESTAMP(created_at) AS added_at
+                        FROM entries
+                        WHERE created_at >= NOW() - INTERVAL :seconds SECOND
+                        AND simhash IS NOT NULL
+                        ORDER BY created_at
+                    """),
+                    {'seconds': int(self.near_dup_index.window_seconds)}
+                )
+                for row in rows:
+                    self.near_dup_index.add(int(row.simhash), float(row.added_at))
+            logger.info(f"Loaded {len(self.near_dup_index)} recent fingerprints")
+        except Exception as e:
+            logger.warning(f"Could not load recent fingerprints: {type(e).__name__}")
+            logger.debug(f"Detailed error: {str(e)}")
+
+    @staticmethod
+    def _entry_date(entry) -> Optional[datetime]:
+        """Structured published/updated date of an entry, if the parser found one"""
+        for date_field in ('published_parsed', 'updated_parsed'):
+            parsed = getattr(entry, date_field, None)
+            if parsed:
+                try:
+                    return datetime(*parsed[:6])
+                except (TypeError, ValueError):
+                    continue
+        return None
+
+    def _is_newest_first(self, entries) -> bool:
+        """Whether a feed lists entries newest-first, judged by its first and last dates"""
+        first = self._entry_date(entries[0])
+        last = self._entry_date(entries[-1])
+        return first is not None and last is not None and first >= last
+
+    @staticmethod
+    def _entry_key(entry_id: str) -> str:
+        """Compact fingerprint of an entry id for the recent-ids set"""
+        return hashlib.blake2b(entry_id.encode('utf-8'), digest_size=8).hexdigest()
+
+    def _record_watermark(self, feed_url: str, new_keys: List[str],
+                          newest: Optional[datetime], seen: int, skipped: int) -> None:
+        """Queue a feed's updated high-water mark until the run's entries are saved"""
+        previous = self.watermarks.get(feed_url, {})
+        last_published = previous.get('last_published')
+        if newest and (last_published is None or newest > last_published):
+            last_published = newest
+
+        with self._watermark_lock:
+            pending = self._pending_watermarks.get(feed_url)
+            recent_ids = new_keys + (pending or previous).get('recent_ids', [])
+            self._pending_watermarks[feed_url] = {
+                'last_published': last_published,
+                'recent_ids': list(dict.fromkeys(recent_ids))[:self.recent_id_limit],
+                'entries_seen': seen + (pending['entries_seen'] if pending else 0),
+                'entries_skipped': skipped + (pending['entries_skipped'] if pending else 0)
+            }
+
+    def _fetch_feed(self, feed_url: str,
+                    conditional: bool = True) -> Tuple[Optional[bytes], Optional[Dict[str, Optional[str]]]]:
+        """Fetch feed content and its response validators.
+
+        Content is None if the feed is unchanged (HTTP 304). The validators
+        are only queued by the caller once the feed's entries were extracted.
+        """
+        request_headers = {}
+        cached = self.validators.get(feed_url) if self.conditional_get and conditional else None
+        if cached:
+            if cached.get('etag'):
+                request_headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                request_headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            response = self.http.get(feed_url, headers=request_headers)
+        finally:
+            # The host's slot is only needed for the request, not parsing
+            self._release_host_slot()
+        if response.status_code == 304:
+            return None, None
+        response.raise_for_status()
+
+        validators = None
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            validators = {
+                'etag': self.safe_truncate(etag, 255) or None,
+                'last_modified': self.safe_truncate(last_modified, 64) or None
+            }
+        return response.content, validators
+
+    def _queue_validators(self, feed_url: str, validators: Optional[Dict[str, Optional[str]]]) -> None:
+        """Remember a fully processed feed's validators for save_validators()"""
+        if validators and self.conditional_get:
+            with self._validator_lock:
+                self._pending_validators[feed_url] = validators
+
+    def _add_stage_time(self, stage: str, seconds: float) -> None:
+        with self._stage_lock:
+            self.stage_times[stage] += seconds
+
+    @contextmanager
+    def _stage(self, stage: str):
+        """Accumulate wall-clock time spent in a pipeline stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_stage_time(stage, time.perf_counter() - start)
+
+    def _release_host_slot(self) -> None:
+        """Hand back the host slot held for this thread's feed, if any"""
+        release = getattr(self._local, 'release_host', None)
+        if release is not None:
+            self._local.release_host = None
+            release()
+
+    def _run_with_host_slot(self, worker: Callable[[int, str], T], feed_id: int, feed_url: str,
+                            release: Callable[[], None]) -> T:
+        """Run a feed worker whose host slot is freed once its fetch returns"""
+        self._local.release_host = release
+        try:
+            return worker(feed_id, feed_url)
+        finally:
+            # Covers workers that fail or return before fetching
+            self._release_host_slot()
+
+    def map_feeds(self, worker: Callable[[int, str], T],
+                   feeds: Iterable[Tuple[int, str]]) -> Iterator[T]:
+        """Run worker over (feed_id, feed_url) pairs, yielding results as they complete.
+
+        Feeds whose host already has per_host_limit fetches running wait here
+        rather than on a pool thread, so one busy host can't stall the others.
+        """
+        if self.fetch_concurrency <= 1:
+            for feed_id, feed_url in feeds:
+                yield worker(feed_id, feed_url)
+            return
+
+        logger.info(
+            f"Fetching feeds with {self.fetch_concurrency} workers "
+            f"({self.per_host_limit} per host)"
+        )
+        # Cap in-flight feeds so finished results can't pile up behind slow saves,
+        # and feeds read ahead while their hosts are busy
+        max_in_flight = self.fetch_concurrency * 2
+        max_waiting = max_in_flight * 4
+        feeds = iter(feeds)
+        exhausted = False
+        # Slot releases and completions from pool threads; only this thread
+        # touches the counts below
+        events: queue.Queue = queue.Queue()
+        fetching: Dict[str, int] = defaultdict(int)
+        waiting: Dict[str, deque] = {}
+        waiting_count = 0
+
+        with ThreadPoolExecutor(max_workers=self.fetch_concurrency) as executor:
+            pending = {}
+
+            def submit(feed_id: int, feed_url: str, host: str) -> None:
+                fetching[host] += 1
+                future = executor.submit(self._run_with_host_slot, worker, feed_id, feed_url,
+                                         lambda: events.put(('released', host)))
+                pending[future] = feed_url
+                future.add_done_callback(lambda done: events.put(('done', done)))
+
+            while True:
+                # Waiting feeds first, in order, for hosts with a free slot again
+                for host in list(waiting):
+                    backlog = waiting[host]
+                    while backlog and fetching[host] < self.per_host_limit and len(pending) < max_in_flight:
+                        submit(*backlog.popleft(), host)
+                        waiting_count -= 1
+                    if not backlog:
+                        del waiting[host]
+
+                while not exhausted and len(pending) < max_in_flight and waiting_count < max_waiting:
+                    try:
+                        feed_id, feed_url = next(feeds)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    host = urlparse(feed_url).netloc.lower()
+                    if host in waiting or fetching[host] >= self.per_host_limit:
+                        waiting.setdefault(host, deque()).append((feed_id, feed_url))
+                        waiting_count += 1
+                    else:
+                        submit(feed_id, feed_url, host)
+
+                if not pending and not waiting and exhausted:
+                    break
+
+                kind, value = events.get()
+                if kind == 'released':
+                    fetching[value] -= 1
+                    continue
+                feed_url = pending.pop(value)
+                try:
+                    yield value.result()
+                except Exception as e:
+                    logger.error(f"Feed worker error for {feed_url}: {type(e).__name__}")
+                    logger.debug(f"Detailed error: {str(e)}")
+
+    def iter_feed_entries(self, feeds_df: pd.DataFrame) -> Iterator[pd.DataFrame]:
+        """Process feeds and yield entry DataFrames as each feed completes"""
+        feeds = ((row['id'], row['feed_url']) for _, row in feeds_df.iterrows())
+        yield from self.map_feeds(self.process_feed, feeds)
+
+    def iter_feed_records(self, feeds: Iterable[Tuple[int, str]]) -> Iterator[List[EntryRecord]]:
+        """Process feeds and yield each feed's entry records as it completes"""
+        yield from self.map_feeds(lambda feed_id, feed_url: list(self.iter_entries(feed_id, feed_url)), feeds)
+
     def process_feed(self, feed_id: int, feed_url: str) -> pd.DataFrame:
         """Process a single feed and return entries as DataFrame"""
+        records = list(self.iter_entries(feed_id, feed_url))
+        if not records:
+            return pd.DataFrame()
+        entries_df = pd.DataFrame(records, columns=EntryRecord._fields)
+        # Plain ints: a missing fingerprint would turn the column into float64,
+        # which can't hold 64-bit simhashes exactly, and to_sql rejects uint64
+        entries_df['simhash'] = pd.Series([record.simhash for record in records], dtype=object)
+        return entries_df
+
+    def iter_entries(self, feed_id: int, feed_url: str) -> Iterator[EntryRecord]:
+        """Fetch and parse a single feed, yielding its entries as records"""
         if not self.validate_feed_url(feed_url):
             logger.error(f"Invalid feed URL: {feed_url}")
-            return pd.DataFrame()
+            return
 
         try:
             logger.info(f"Processing feed {feed_id}: {feed_url}")
             
-            # Add headers for request
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'application/rss+xml, application/xml, application/atom+xml, text/xml;q=0.9, */*;q=0.8'
-            }
-            
             try:
                 # Fetch feed content with timeout
-                response = requests.get(feed_url, headers=headers, timeout=self.feed_timeout)
-                response.raise_for_status()
-                feed_content = response.content
+                with self._stage('fetch'):
+                    feed_content, validators = self._fetch_feed(feed_url)
             except RequestException as e:
                 logger.error(f"Failed to fetch feed {feed_url}: {str(e)}")
-                return pd.DataFrame()
+                return
+            
+            if feed_content is None:
+                logger.info(f"Feed not modified since last run: {feed_url}")
+                return
             
-            # Parse feed content
-            feed = feedparser.parse(feed_content)
+            # Parse feed content, off the GIL when a parse pool is configured
+            with self._stage('parse'):
+                if self.parse_pool is not None:
+                    feed = self.parse_pool.submit(parse_feed, feed_content, self.fast_parser).result()
+                else:
+                    feed = parse_feed(feed_content, self.fast_parser)
             
             # Debug feed parsing results
             logger.debug(f"Feed status: {feed.get('status', 'unknown')}")
@@ -210,15 +649,31 @@ class FeedProcessor:
             
             if hasattr(feed, 'bozo_exception'):
                 logger.error(f"Feed parsing error for {feed_url}: {feed.bozo_exception}")
-                return pd.DataFrame()
+                return
             
             if not hasattr(feed, 'entries') or not feed.entries:
                 logger.warning(f"No entries found in feed: {feed_url}")
-                return pd.DataFrame()
+                return
             
             logger.info(f"Found {len(feed.entries)} entries in feed {feed_url}")
             
-            entries = []
+            # Entries seen on a previous run are skipped. Only a newest-first
+            # feed can stop at one, and only once it's older than the
+            # watermark; other feeds may append new items after old ones
+            seen_keys = set(self.watermarks.get(feed_url, {}).get('recent_ids', []))
+            last_published = self.watermarks.get(feed_url, {}).get('last_published')
+            newest_first = self._is_newest_first(feed.entries)
+            new_keys = []
+            newest = None
+            skipped = 0
+            
+            processed = 0
+            failed = 0
+            near_dups = 0
+            dates = FeedDateParser()
+            # Transform time excludes time spent suspended at yield
+            transform_time = 0.0
+            mark = time.perf_counter()
             for i, entry in enumerate(feed.entries):
                 try:
                     # Detailed debug logging for first entry
@@ -226,12 +681,24 @@ class FeedProcessor:
                         logger.debug(f"Sample entry structure for {feed_url}: {entry}")
                         logger.debug(f"Entry keys: {entry.keys()}")
                     
+                    link = getattr(entry, 'link', None) or ''
+                    entry_id = getattr(entry, 'id', None) or link or ''
+                    
+                    key = None
+                    if self.incremental and entry_id:
+                        key = self._entry_key(entry_id)
+                        if key in seen_keys:
+                            entry_date = self._entry_date(entry)
+                            if newest_first and last_published and entry_date and entry_date < last_published:
+                                skipped += len(feed.entries) - i
+                                break
+                            skipped += 1
+                            continue
+                    
                     # Extract data with fallbacks
                     title = getattr(entry, 'title', None) or ''
-                    link = getattr(entry, 'link', None) or ''
                     summary = getattr(entry, 'summary', None) or getattr(entry, 'description', '') or ''
                     author = getattr(entry, 'author', None) or ''
-                    entry_id = getattr(entry, 'id', None) or link or ''
                     
                     published = None
                     if hasattr(entry, 'published_parsed') and entry.published_parsed:
@@ -248,121 +715,284 @@ class FeedProcessor:
                                     except (TypeError, ValueError):
                                         continue
                     
-                    entry_data = {
-                        'feed_id': feed_id,
-                        'title': self.safe_truncate(title),
-                        'link': self.safe_truncate(link),
-                        'published': published,
-                        'author': self.safe_truncate(author),
-                        'entry_id': self.safe_truncate(entry_id),
-                        'summary': self.safe_truncate(summary)
-                    }
+                    if published is None:
+                        # Dates the parser couldn't structure, e.g. unusual formats
+                        published = dates.parse(getattr(entry, 'published', None))
                     
-                    entries.append(entry_data)
+                    if published and (newest is None or published > newest):
+                        newest = published
+                    
+                    record = EntryRecord(
+                        feed_id=feed_id,
+                        title=self.safe_truncate(title),
+                        link=normalize_link(link),
+                        published=published,
+                        author=self.safe_truncate(author),
+                        entry_id=self.safe_truncate(entry_id),
+                        summary=self.safe_truncate(summary)
+                    )
                     
                 except Exception as e:
                     logger.error(f"Entry processing error in {feed_url}: {type(e).__name__}")
                     logger.debug(f"Detailed error: {str(e)}")
+                    failed += 1
                     continue
+                
+                if self.near_dup_index is not None:
+                    fingerprint = simhash(f"{record.title} {record.summary}")
+                    if fingerprint is not None:
+                        is_duplicate = self.near_dup_index.check_and_add(fingerprint)
+                        if is_duplicate:
+                            near_dups += 1
+                            if self.near_dup_mode == 'collapse':
+                                if key:
+                                    new_keys.append(key)
+                                continue
+                        record = record._replace(simhash=fingerprint, is_duplicate=is_duplicate)
+                
+                processed += 1
+                transform_time += time.perf_counter() - mark
+                yield record
+                mark = time.perf_counter()
+                # Only entries that made it out are remembered; one that
+                # failed extraction is retried on the next run
+                if key:
+                    new_keys.append(key)
             
-            if not entries:
-                logger.warning(f"No valid entries processed from {feed_url}")
-                return pd.DataFrame()
+            self._add_stage_time('transform', transform_time + time.perf_counter() - mark)
+            
+            if self.incremental:
+                self._record_watermark(feed_url, new_keys, newest, len(feed.entries), skipped)
+            # A 304 next run would skip the feed, so only a clean pass may keep
+            # its validators; a feed with failed entries is fetched in full again
+            if not failed:
+                self._queue_validators(feed_url, validators)
             
-            df = pd.DataFrame(entries)
-            logger.info(f"Successfully processed {len(df)} entries from feed {feed_id}: {feed_url}")
-            return df
+            if skipped:
+                logger.info(f"Skipped {skipped} already-seen entries in {feed_url}")
+            
+            if near_dups:
+                action = 'Dropped' if self.near_dup_mode == 'collapse' else 'Tagged'
+                logger.info(f"{action} {near_dups} near-duplicate entries in {feed_url}")
+            
+            if not processed:
+                if not skipped:
+                    logger.warning(f"No valid entries processed from {feed_url}")
+                return
+            
+            logger.info(f"Successfully processed {processed} entries from feed {feed_id}: {feed_url}")
             
         except Exception as e:
             logger.error(f"Feed processing error for {feed_url}: {type(e).__name__}")
             logger.debug(f"Detailed error: {str(e)}")
-            return pd.DataFrame()
 
-    def save_entries(self, entries_df: pd.DataFrame) -> None:
-        """Save entries to database using pandas"""
+    @staticmethod
+    def _drop_archived(conn, rows: List[Dict]) -> List[Dict]:
+        """Rows whose link hasn't been moved to entries_archive.
+
+        Archived links are gone from the hot table's UNIQUE key, so INSERT
+        IGNORE alone would store them again when a feed still lists them.
+        """
+        if not rows:
+            return rows
+        archived = {
+            bytes(row[0]) for row in conn.execute(
+                text("SELECT link_hash FROM entries_archive WHERE link_hash IN :hashes")
+                .bindparams(bindparam('hashes', expanding=True)),
+                {'hashes': list({link_hash(row['link']) for row in rows})}
+            )
+        }
+        if not archived:
+            return rows
+        return [row for row in rows if link_hash(row['link']) not in archived]
+
+    @staticmethod
+    def _insert_ignore(table, conn, keys, data_iter) -> int:
+        """pandas to_sql method that lets the link_hash UNIQUE key drop duplicates"""
+        rows = FeedProcessor._drop_archived(conn, [dict(zip(keys, row)) for row in data_iter])
+        if not rows:
+            return 0
+        stmt = table.table.insert().values(rows).prefix_with('IGNORE')
+        return conn.execute(stmt).rowcount
+
+    def save_entries(self, entries_df: pd.DataFrame) -> int:
+        """Save entries to database, letting MySQL skip links it already has"""
         if entries_df.empty:
             logger.warning("No entries to save")
-            return
+            return 0
 
         try:
-            # Remove duplicates before saving, keeping the latest version
+            # Remove duplicates within the chunk, keeping the latest version
             entries_df = entries_df.drop_duplicates(subset=['link'], keep='last')
             
-            # Get existing links
-            existing_links = pd.read_sql(
-                text("SELECT link FROM entries"),
-                self.engine
-            )['link'].tolist()
+            # INSERT IGNORE against the link_hash UNIQUE key keeps the cost
+            # proportional to the chunk rather than the entries table
+            with self._stage('save'):
+                saved = entries_df.to_sql(
+                    'entries',
+                    self.engine,
+                    if_exists='append',
+                    index=False,
+                    method=self._insert_ignore,
+                    chunksize=self.chunk_size
+                ) or 0
             
-            # Filter out entries that already exist
-            new_entries = entries_df[~entries_df['link'].isin(existing_links)]
-            
-            if new_entries.empty:
+            if saved == 0:
                 logger.info("No new entries to save")
-                return
+                return 0
             
-            # Save only new entries to database in chunks
-            new_entries.to_sql(
-                'entries',
-                self.engine,
-                if_exists='append',
-                index=False,
-                method='multi',
-                chunksize=self.chunk_size
-            )
-            logger.info(f"Saved {len(new_entries)} new entries to database")
+            logger.info(f"Saved {saved} new entries to database")
             
             # Log how many duplicates were skipped
-            skipped = len(entries_df) - len(new_entries)
+            skipped = len(entries_df) - saved
+            if skipped > 0:
+                logger.info(f"Skipped {skipped} existing entries")
+            return saved
+            
+        except Exception as e:
+            logger.error(f"Database error: {type(e).__name__}")
+            logger.debug(f"Detailed error: {str(e)}")
+            raise
+
+    def save_records(self, records: List[EntryRecord]) -> int:
+        """Save a batch of entry records with executemany, skipping existing links"""
+        if not records:
+            return 0
+
+        # Remove duplicates within the batch on the same key MySQL uses, keeping the latest version
+        unique = list({link_hash(record.link): record for record in records}.values())
+        
+        try:
+            with self._stage('save'), self.engine.begin() as conn:
+                rows = self._drop_archived(conn, [record._asdict() for record in unique])
+                saved = 0
+                if rows:
+                    result = conn.execute(
+                        text(f"""
+                            INSERT IGNORE INTO entries ({', '.join(EntryRecord._fields)})
+                            VALUES ({', '.join(':' + field for field in EntryRecord._fields)})
+                        """),
+                        rows
+                    )
+                    saved = max(result.rowcount, 0)
+            logger.info(f"Saved {saved} new entries to database")
+            
+            skipped = len(unique) - saved
             if skipped > 0:
                 logger.info(f"Skipped {skipped} existing entries")
+            return saved
             
         except Exception as e:
             logger.error(f"Database error: {type(e).__name__}")
             logger.debug(f"Detailed error: {str(e)}")
             raise
 
+def run_stream_pipeline(processor: FeedProcessor,
+                        feeds: Optional[List[Tuple[int, str]]] = None) -> Dict[str, int]:
+    """Stream entry records from every feed into bounded executemany batches.
+
+    feeds defaults to the CSV list; returns feed, entry and saved-row counts.
+    """
+    feeds = processor.get_feed_list() if feeds is None else feeds
+    counts = {'feeds': len(feeds), 'feeds_with_entries': 0, 'entries': 0, 'saved': 0}
+    if not feeds:
+        logger.warning("No feeds found in CSV file")
+        return counts
+
+    batch: List[EntryRecord] = []
+    
+    for records in processor.iter_feed_records(feeds):
+        batch.extend(records)
+        counts['entries'] += len(records)
+        if records:
+            counts['feeds_with_entries'] += 1
+        
+        # Flush full batches so memory stays bounded by chunk size
+        if len(batch) >= processor.chunk_size:
+            counts['saved'] += processor.save_records(batch)
+            batch = []
+    
+    if batch:
+        counts['saved'] += processor.save_records(batch)
+    
+    # Entries are stored, so this run's validators can be trusted next time
+    processor.save_validators()
+    processor.save_watermarks()
+    processor.http.log_stats()
+    
+    if counts['entries']:
+        logger.info("\n=== Processing Summary ===")
+        logger.info(f"Total feeds processed: {len(feeds)}")
+        logger.info(f"Total entries fetched: {counts['entries']}")
+        logger.info(f"Total entries saved: {counts['saved']}")
+        logger.info(f"Entries per feed: {counts['entries']/len(feeds):.1f}")
+        logger.info("========================")
+    else:
+        logger.warning("No entries collected from any feed")
+    return counts
+
+def run_dataframe_pipeline(processor: FeedProcessor,
+                           feeds_df: Optional[pd.DataFrame] = None) -> Dict[str, int]:
+    """Collect per-feed DataFrames and save them in pandas chunks.
+
+    feeds_df defaults to the CSV feeds; returns the same counts as run_stream_pipeline.
+    """
+    feeds_df = processor.get_feeds() if feeds_df is None else feeds_df
+    counts = {'feeds': len(feeds_df), 'feeds_with_entries': 0, 'entries': 0, 'saved': 0}
+    
+    if feeds_df.empty:
+        logger.warning("No feeds found in database")
+        return counts
+    
+    all_entries = []
+    total_size = 0
+    
+    # Process feeds and save in chunks as they arrive
+    for entries_df in processor.iter_feed_entries(feeds_df):
+        if not entries_df.empty:
+            all_entries.append(entries_df)
+            total_size += len(entries_df)
+            counts['entries'] += len(entries_df)
+            counts['feeds_with_entries'] += 1
+            
+            # Save in chunks to manage memory
+            if total_size >= processor.chunk_size:
+                combined_chunk = pd.concat(all_entries, ignore_index=True)
+                counts['saved'] += processor.save_entries(combined_chunk)
+                all_entries = []
+                total_size = 0
+    
+    # Save any remaining entries
+    if all_entries:
+        combined_entries = pd.concat(all_entries, ignore_index=True)
+        counts['saved'] += processor.save_entries(combined_entries)
+    
+    # Entries are stored, so this run's validators can be trusted next time
+    processor.save_validators()
+    processor.save_watermarks()
+    processor.http.log_stats()
+    
+    if counts['entries']:
+        # Print summary
+        logger.info("\n=== Processing Summary ===")
+        logger.info(f"Total feeds processed: {len(feeds_df)}")
+        logger.info(f"Total entries fetched: {counts['entries']}")
+        logger.info(f"Total entries saved: {counts['saved']}")
+        logger.info(f"Entries per feed: {counts['entries']/len(feeds_df):.1f}")
+        logger.info("========================")
+    else:
+        logger.warning("No entries collected from any feed")
+    return counts
+
 def main():
     logger.info("=== Starting RSS Feed Processor ===")
     
     try:
         processor = FeedProcessor()
-        feeds_df = processor.get_feeds()
-        
-        if feeds_df.empty:
-            logger.warning("No feeds found in database")
-            return
-        
-        all_entries = []
-        total_size = 0
-        
-        # Process feeds and save in chunks
-        for _, row in feeds_df.iterrows():
-            entries_df = processor.process_feed(row['id'], row['feed_url'])
-            if not entries_df.empty:
-                all_entries.append(entries_df)
-                total_size += len(entries_df)
-                
-                # Save in chunks to manage memory
-                if total_size >= processor.chunk_size:
-                    combined_chunk = pd.concat(all_entries, ignore_index=True)
-                    processor.save_entries(combined_chunk)
-                    all_entries = []
-                    total_size = 0
-        
-        # Save any remaining entries
-        if all_entries:
-            combined_entries = pd.concat(all_entries, ignore_index=True)
-            processor.save_entries(combined_entries)
-            
-            # Print summary
-            logger.info("\n=== Processing Summary ===")
-            logger.info(f"Total feeds processed: {len(feeds_df)}")
-            logger.info(f"Total entries saved: {len(combined_entries)}")
-            logger.info(f"Entries per feed: {len(combined_entries)/len(feeds_df):.1f}")
-            logger.info("========================")
+        if processor.pipeline == 'dataframe':
+            run_dataframe_pipeline(processor)
         else:
-            logger.warning("No entries collected from any feed")
+            run_stream_pipeline(processor)
         
     except Exception as e:
         logger.error(f"Process error: {type(e).__name__}")
@@ -370,4 +1000,4 @@ def main():
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
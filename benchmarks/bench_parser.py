@@ -0,0 +1,51 @@
+"""Compare feedparser and the fast-path parser on synthetic feeds.
+
+Usage: python -m benchmarks.bench_parser [--entries 200] [--repeat 20]
+"""
+import argparse
+import json
+import time
+
+import feedparser
+
+from benchmarks.synthetic_feeds import atom_feed, rss_feed
+from fast_feed_parser import fast_parse
+
+def _time(parse, content: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse(content)
+    return time.perf_counter() - start
+
+def run(entries: int, repeat: int, summary_size: int, html: bool) -> dict:
+    results = {}
+    for fmt, build in (('rss20', rss_feed), ('atom10', atom_feed)):
+        content = build(entries=entries, summary_size=summary_size, html=html)
+
+        # Both paths must agree before their speed is worth comparing
+        slow, fast = feedparser.parse(content), fast_parse(content)
+        for field in ('title', 'link', 'summary', 'author', 'id', 'published_parsed'):
+            assert [e.get(field) for e in slow.entries] == [e.get(field) for e in fast.entries], field
+
+        slow_time = _time(feedparser.parse, content, repeat)
+        fast_time = _time(fast_parse, content, repeat)
+        results[fmt] = {
+            'bytes': len(content),
+            'entries': entries,
+            'feedparser_entries_per_sec': round(entries * repeat / slow_time, 1),
+            'fast_entries_per_sec': round(entries * repeat / fast_time, 1),
+            'speedup': round(slow_time / fast_time, 2)
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--summary-size', type=int, default=500)
+    parser.add_argument('--plain', action='store_true', help='Plain-text summaries (no sanitizing)')
+    args = parser.parse_args()
+    print(json.dumps(run(args.entries, args.repeat, args.summary_size, not args.plain), indent=2))
+
+if __name__ == "__main__":
+    main()
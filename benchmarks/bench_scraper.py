@@ -0,0 +1,195 @@
+r"""Benchmark FeedProcessor against local synthetic feed servers.
+
+Feeds are served from one or more local HTTP servers, one port per simulated
+host, so no live Substack or BBC endpoint is touched. Entries are written to
+the MySQL database configured by the usual DB_* variables. DB_NAME must name
+a scratch database (--reset refuses to touch the default rss_feed), e.g.
+
+    docker run -d --name bench_mysql -p 3307:3306 \
+        -e MYSQL_ROOT_PASSWORD=root -e MYSQL_DATABASE=rss_bench \
+        -e MYSQL_USER=rss_user -e MYSQL_PASSWORD=rss_password \
+        -v "$PWD/init.sql:/docker-entrypoint-initdb.d/init.sql" mysql:8.0
+    DB_HOST=127.0.0.1 DB_PORT=3307 DB_NAME=rss_bench python -m benchmarks.bench_scraper --feeds 500 --reset
+
+Results are printed as JSON so runs can be diffed or collected.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+from benchmarks.synthetic_feeds import atom_feed, rss_feed
+
+class FeedServer:
+    def __init__(self, entries: int, summary_size: int, latency: float,
+                 jitter: float, error_rate: float, atom_ratio: float, seed: int):
+        """Local HTTP server that serves deterministic synthetic feeds at /feeds/<n>"""
+        self.entries = entries
+        self.summary_size = summary_size
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.atom_ratio = atom_ratio
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self._cache = {}
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def body(self, feed_number: int) -> bytes:
+        if feed_number not in self._cache:
+            build = atom_feed if (feed_number % 100) < self.atom_ratio * 100 else rss_feed
+            self._cache[feed_number] = build(
+                entries=self.entries, summary_size=self.summary_size,
+                seed=feed_number, name=f"feed{feed_number}"
+            )
+        return self._cache[feed_number]
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        with self.rng_lock:
+            delay = max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0)
+            fail = self.rng.random() < self.error_rate
+        time.sleep(delay)
+
+        try:
+            feed_number = int(request.path.rsplit('/', 1)[-1])
+        except ValueError:
+            feed_number = None
+        if fail or feed_number is None:
+            request.send_response(500 if fail else 404)
+            request.send_header('Content-Length', '0')
+            request.end_headers()
+            return
+
+        content = self.body(feed_number)
+        request.send_response(200)
+        request.send_header('Content-Type', 'application/xml')
+        request.send_header('Content-Length', str(len(content)))
+        request.end_headers()
+        request.wfile.write(content)
+
+    def start(self) -> 'FeedServer':
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process and its children (parse pool) in MB"""
+    self_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    child_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024  # macOS reports bytes
+    return round((self_kb + child_kb) / scale, 1)
+
+def reset_tables(processor) -> None:
+    # Only ever empty a database the caller explicitly named as scratch
+    db_name = os.getenv('DB_NAME')
+    if not db_name or db_name == 'rss_feed':
+        raise SystemExit("--reset needs DB_NAME set to a scratch database other than rss_feed")
+    from sqlalchemy import text
+    with processor.engine.begin() as conn:
+        for table in ('entries', 'feed_validators', 'feed_watermarks'):
+            conn.execute(text(f"DELETE FROM {table}"))
+
+def run(args) -> dict:
+    # Benchmarks must not let validators or high-water marks from earlier runs skip work
+    os.environ.setdefault('CONDITIONAL_GET', 'false')
+    os.environ.setdefault('INCREMENTAL_EXTRACTION', 'false')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')  # Keep stdout readable as JSON
+    from batch_rss_scraper import FeedProcessor, run_dataframe_pipeline, run_stream_pipeline
+
+    servers = [
+        FeedServer(args.entries, args.summary_size, args.latency, args.jitter,
+                   args.error_rate, args.atom_ratio, seed=args.seed + i).start()
+        for i in range(args.hosts)
+    ]
+    feeds: List[Tuple[int, str]] = [
+        (i + 1, f"http://127.0.0.1:{servers[i % len(servers)].port}/feeds/{i}")
+        for i in range(args.feeds)
+    ]
+
+    try:
+        processor = FeedProcessor()
+        if args.reset:
+            reset_tables(processor)
+
+        start = time.perf_counter()
+        if processor.pipeline == 'dataframe':
+            import pandas as pd
+            counts = run_dataframe_pipeline(processor, pd.DataFrame(feeds, columns=['id', 'feed_url']))
+        else:
+            counts = run_stream_pipeline(processor, feeds)
+        elapsed = time.perf_counter() - start
+    finally:
+        for server in servers:
+            server.stop()
+
+    return {
+        'config': {
+            'feeds': args.feeds,
+            'hosts': args.hosts,
+            'entries_per_feed': args.entries,
+            'summary_size': args.summary_size,
+            'latency': args.latency,
+            'error_rate': args.error_rate,
+            'pipeline': processor.pipeline,
+            'fetch_concurrency': processor.fetch_concurrency,
+            'per_host_limit': processor.per_host_limit,
+            'fast_parser': processor.fast_parser,
+            'near_dup_mode': processor.near_dup_mode
+        },
+        'elapsed_s': round(elapsed, 3),
+        'feeds_ok': counts['feeds_with_entries'],
+        'entries': counts['entries'],
+        'rows_saved': counts['saved'],
+        'feeds_per_s': round(args.feeds / elapsed, 2),
+        'entries_per_s': round(counts['entries'] / elapsed, 1),
+        'db_rows_per_s': round(counts['saved'] / elapsed, 1),
+        'peak_rss_mb': peak_rss_mb(),
+        'stage_seconds': {stage: round(seconds, 3) for stage, seconds in sorted(processor.stage_times.items())},
+        'http_hosts': processor.http.stats.snapshot()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=200)
+    parser.add_argument('--hosts', type=int, default=20, help='Simulated hosts (one local port each)')
+    parser.add_argument('--entries', type=int, default=50, help='Entries per feed')
+    parser.add_argument('--summary-size', type=int, default=800, help='Summary characters per entry')
+    parser.add_argument('--latency', type=float, default=0.2, help='Mean response latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Latency jitter in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.02, help='Fraction of requests answered with 500')
+    parser.add_argument('--atom-ratio', type=float, default=0.3, help='Fraction of feeds served as Atom')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--reset', action='store_true', help='Empty entries and feed state tables first')
+    parser.add_argument('--output', help='Also write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+WORDS = (
+    "market election policy court climate energy report budget vote senate "
+    "war peace trade union strike inflation rate bank court ruling science "
+    "health vaccine study data city council school police border"
+).split()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+def _summary(rng: random.Random, size: int, html: bool) -> str:
+    text = ''
+    while len(text) < size:
+        text += _sentence(rng, 12) + '. '
+    text = text[:size]
+    return f"<p>{text}</p>" if html else text
+
+def rss_feed(entries: int = 50, summary_size: int = 500, html: bool = True,
+             seed: int = 0, name: str = 'synthetic') -> bytes:
+    """Build an RSS 2.0 document with deterministic synthetic entries"""
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for i in range(entries):
+        published = format_datetime(now - timedelta(hours=i))
+        items.append(
+            "<item>"
+            f"<title>{escape(_sentence(rng, 8))}</title>"
+            f"<link>https://{name}.example.com/p/{seed}-{i}</link>"
+            f"<guid>https://{name}.example.com/p/{seed}-{i}</guid>"
+            f"<dc:creator>{escape(_sentence(rng, 2))}</dc:creator>"
+            f"<pubDate>{published}</pubDate>"
+            f"<description>{escape(_summary(rng, summary_size, html))}</description>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/"><channel>'
+        f"<title>{name}</title><link>https://{name}.example.com</link>"
+        f"<description>Synthetic feed</description>{''.join(items)}"
+        "</channel></rss>"
+    ).encode('utf-8')
+
+def atom_feed(entries: int = 50, summary_size: int = 500, html: bool = True,
+              seed: int = 0, name: str = 'synthetic') -> bytes:
+    """Build an Atom 1.0 document with deterministic synthetic entries"""
+    rng = random.Random(seed)
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    items = []
+    for i in range(entries):
+        published = (now - timedelta(hours=i)).isoformat().replace('+00:00', 'Z')
+        items.append(
+            "<entry>"
+            f"<title>{escape(_sentence(rng, 8))}</title>"
+            f'<link rel="alternate" href="https://{name}.example.com/a/{seed}-{i}"/>'
+            f"<id>urn:synthetic:{name}:{seed}:{i}</id>"
+            f"<author><name>{escape(_sentence(rng, 2))}</name></author>"
+            f"<published>{published}</published><updated>{published}</updated>"
+            f'<summary type="html">{escape(_summary(rng, summary_size, html))}</summary>'
+            "</entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        f'<title>{name}</title><link href="https://{name}.example.com"/>'
+        f"<id>urn:synthetic:{name}</id><updated>{now.isoformat()}</updated>"
+        f"{''.join(items)}</feed>"
+    ).encode('utf-8')
@@ -25,10 +25,10 @@ class ChronicleGenerator:
             conn = mysql.connector.connect(**self.db_config)
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT DISTINCT DATE(published) 
+                SELECT DISTINCT published_date 
                 FROM entries 
-                WHERE published >= DATE_SUB(CURDATE(), INTERVAL 2 DAY)
-                ORDER BY DATE(published) DESC
+                WHERE published_date >= DATE_SUB(CURDATE(), INTERVAL 2 DAY)
+                ORDER BY published_date DESC
             """)
             return [row[0] for row in cursor.fetchall()]
         finally:
@@ -44,7 +44,8 @@ class ChronicleGenerator:
                 SELECT e.title, e.summary, f.title as publication
                 FROM entries e
                 JOIN feeds f ON e.feed_id = f.id
-                WHERE DATE(e.published) = %s
+                WHERE e.published_date = %s
+                AND e.is_duplicate = 0
             """, (date,))
             return "\n".join(
                 f"{row['publication']} reports: {row['title']} - {row['summary'][:200]}"
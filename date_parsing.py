@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple
+
+try:
+    # feedparser's generic handler understands dozens of odd formats
+    from feedparser.datetimes import _parse_date as _feedparser_date
+except ImportError:
+    _feedparser_date = None
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Normalize to the naive UTC datetimes stored in entries.published"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _rfc822(value: str) -> datetime:
+    # RFC 822 with numeric offsets (+0000) or zone names (GMT, EST)
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, IndexError) as e:
+        raise ValueError(str(e))
+
+def _iso8601(value: str) -> datetime:
+    # ISO 8601 / Atom, including a trailing Z
+    return datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+
+def _strptime(fmt: str) -> Callable[[str], datetime]:
+    return lambda value: datetime.strptime(value, fmt)
+
+# Parsers tried in order when a feed's format isn't known yet; each
+# raises ValueError on a mismatch
+DATE_PARSERS: Tuple[Tuple[str, Callable[[str], datetime]], ...] = (
+    ('rfc822', _rfc822),
+    ('iso8601', _iso8601),
+    ('%Y/%m/%d %H:%M:%S', _strptime('%Y/%m/%d %H:%M:%S')),
+    ('%B %d, %Y', _strptime('%B %d, %Y')),
+)
+
+class FeedDateParser:
+    def __init__(self):
+        """Date parser for one feed that remembers the format that last worked"""
+        self.format: Optional[str] = None
+        self._parser: Optional[Callable[[str], datetime]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, value: Optional[str]) -> Optional[datetime]:
+        """Parse a date string to a naive UTC datetime, or None if unparseable"""
+        if not value:
+            return None
+        value = value.strip()
+
+        # Fast path: the format this feed used last time
+        if self._parser is not None:
+            try:
+                parsed = self._parser(value)
+                self.hits += 1
+                return to_naive_utc(parsed)
+            except ValueError:
+                pass
+        self.misses += 1
+
+        for name, parser in DATE_PARSERS:
+            if name == self.format:
+                continue
+            try:
+                parsed = parser(value)
+            except ValueError:
+                continue
+            self.format, self._parser = name, parser
+            return to_naive_utc(parsed)
+
+        # Slow fallback for anything else
+        if _feedparser_date is not None:
+            parsed = _feedparser_date(value)
+            if parsed:
+                return datetime(*parsed[:6])
+        return None
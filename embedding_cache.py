@@ -0,0 +1,124 @@
+import json
+import os
+import re
+from typing import List, Optional
+
+import numpy as np
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, dim: int, path: str = None,
+                 max_bytes: int = None, dtype: str = None):
+        """On-disk embedding cache for one model, keyed by 16-byte content hashes.
+
+        Vectors live in a memory-mapped matrix with one row per slot; the
+        key and last-used arrays are small enough to keep in memory and are
+        written on flush(). When full, the least recently used tenth of the
+        slots is evicted in one go.
+        """
+        self.model_name = model_name
+        self.dim = dim
+        self.dtype = np.dtype(dtype or os.getenv('EMBEDDING_CACHE_DTYPE', 'float16'))
+        max_bytes = max_bytes or int(float(os.getenv('EMBEDDING_CACHE_MAX_MB', 1024)) * 1024 * 1024)
+        self.capacity = max(max_bytes // (dim * self.dtype.itemsize), 1)
+
+        root = path or os.getenv('EMBEDDING_CACHE_DIR', 'embedding_cache')
+        self.path = os.path.join(root, re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name))
+        os.makedirs(self.path, exist_ok=True)
+        self._meta_path = os.path.join(self.path, 'meta.json')
+        self._keys_path = os.path.join(self.path, 'keys.npy')
+        self._used_path = os.path.join(self.path, 'used.npy')
+        vectors_path = os.path.join(self.path, 'vectors.bin')
+
+        meta = {'model': model_name, 'dim': dim, 'dtype': self.dtype.name, 'capacity': self.capacity}
+        stored = self._read_meta()
+        fresh = stored is None or any(stored.get(k) != v for k, v in meta.items())
+        if fresh:
+            # New cache, or a layout change that invalidates the old one
+            for stale in (self._keys_path, self._used_path, vectors_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            self.keys = np.zeros((self.capacity, 16), dtype=np.uint8)
+            self.used = np.zeros(self.capacity, dtype=np.int64)
+            self.tick = 0
+        else:
+            self.keys = np.load(self._keys_path)
+            self.used = np.load(self._used_path)
+            self.tick = stored['tick']
+
+        # Sparse on disk until slots are actually written
+        self.vectors = np.memmap(vectors_path, dtype=self.dtype, mode='w+' if fresh else 'r+',
+                                 shape=(self.capacity, dim))
+        self._meta = meta
+        # A slot is occupied iff its last-used tick is non-zero
+        self._slots = {self.keys[slot].tobytes(): int(slot) for slot in np.flatnonzero(self.used)}
+        self._free = [int(slot) for slot in np.flatnonzero(self.used == 0)[::-1]]
+        self.hits = 0
+        self.misses = 0
+        if fresh:
+            self.flush()
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_index(self):
+        # Write then rename each file, so a crash never leaves a torn index
+        for path, array in ((self._keys_path, self.keys), (self._used_path, self.used)):
+            with open(f"{path}.tmp", 'wb') as f:
+                np.save(f, array)
+            os.replace(f"{path}.tmp", path)
+        with open(f"{self._meta_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(dict(self._meta, tick=self.tick), f)
+        os.replace(f"{self._meta_path}.tmp", self._meta_path)
+
+    def _evict(self):
+        count = max(self.capacity // 10, 1)
+        victims = np.argpartition(self.used, count - 1)[:count]
+        for slot in victims:
+            self._slots.pop(self.keys[slot].tobytes(), None)
+            self.used[slot] = 0
+            self._free.append(int(slot))
+        # Persist the eviction before the slots are overwritten, so a crash
+        # can't leave an old key pointing at a new vector
+        self.flush()
+
+    def lookup(self, keys: List[bytes]) -> List[Optional[np.ndarray]]:
+        """Cached float32 vectors for keys, None where missing"""
+        self.tick += 1
+        results = []
+        for key in keys:
+            slot = self._slots.get(key)
+            if slot is None:
+                self.misses += 1
+                results.append(None)
+            else:
+                self.hits += 1
+                self.used[slot] = self.tick
+                # A copy, not a view: a later put_many may reuse the slot
+                results.append(np.array(self.vectors[slot], dtype=np.float32))
+        return results
+
+    def put_many(self, keys: List[bytes], vectors: np.ndarray):
+        """Store vectors for keys, evicting old entries if the cache is full"""
+        self.tick += 1
+        for key, vector in zip(keys, vectors):
+            slot = self._slots.get(key)
+            if slot is None:
+                if not self._free:
+                    self._evict()
+                slot = self._free.pop()
+                self._slots[key] = slot
+                self.keys[slot] = np.frombuffer(key, dtype=np.uint8)
+            self.vectors[slot] = vector
+            self.used[slot] = self.tick
+
+    def flush(self):
+        """Write vectors, then the index that points at them"""
+        self.vectors.flush()
+        self._save_index()
+
+    def __len__(self) -> int:
+        return len(self._slots)
@@ -16,6 +16,10 @@ echo "Initializing database schema..."
 mysql -h db -u rss_user -prss_password rss_feed < /app/init.sql
 echo "Schema initialized!"
 
+# Apply schema changes to existing databases
+echo "Running migrations..."
+python migrate.py
+
 # Run Substack scraper
 echo "Starting Substack scraper..."
 python substack_scraper.py
@@ -0,0 +1,225 @@
+"""Incrementally export entries, feeds and daily summaries to Parquet.
+
+Entries and summaries are written as hive-partitioned datasets under
+EXPORT_DIR (entries/published_date=YYYY-MM-DD/...,
+daily_summaries/summary_date=YYYY-MM-DD/...). Each run looks for rows
+changed since a timestamp watermark (entries.updated_at,
+daily_summaries.generated_at) and rewrites just the date partitions they
+fall in, reading each date back from the hot and archive tables. An entry
+whose published date changes is written to its new partition, but its old
+copy stays until that date is rewritten again. feeds is small and updated
+in place, so it is rewritten as a single snapshot file.
+
+Analytics jobs can open the output with pyarrow.dataset, e.g.
+    pyarrow.dataset.dataset('exports/entries', format='parquet', partitioning='hive')
+"""
+import argparse
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List
+
+import mysql.connector
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from dotenv import load_dotenv
+
+ENTRY_SCHEMA = pa.schema([
+    ('id', pa.int32()),
+    ('feed_id', pa.int32()),
+    ('title', pa.string()),
+    ('link', pa.string()),
+    ('link_hash', pa.binary(16)),
+    ('published', pa.timestamp('s')),
+    ('published_date', pa.date32()),
+    ('author', pa.string()),
+    ('entry_id', pa.string()),
+    ('summary', pa.string()),
+    ('simhash', pa.uint64()),
+    ('is_duplicate', pa.int8()),
+    ('created_at', pa.timestamp('s')),
+])
+
+SUMMARY_SCHEMA = pa.schema([
+    ('id', pa.int32()),
+    ('summary_date', pa.date32()),
+    ('summary_text', pa.string()),
+    ('article_count', pa.int32()),
+    ('generated_at', pa.timestamp('s')),
+    ('publications', pa.string()),
+    ('articles', pa.string()),
+])
+
+FEED_SCHEMA = pa.schema([
+    ('id', pa.int32()),
+    ('title', pa.string()),
+    ('link', pa.string()),
+    ('feed_url', pa.string()),
+    ('description', pa.string()),
+    ('author', pa.string()),
+    ('created_at', pa.timestamp('s')),
+])
+
+EPOCH = '1970-01-01 00:00:00'
+
+# table -> (schema, change-tracking column, partition column, archive table).
+# Entries are upserted and summaries regenerated, so a changed row's whole
+# date partition is rewritten rather than appended to.
+INCREMENTAL_TABLES = {
+    'entries': (ENTRY_SCHEMA, 'updated_at', 'published_date', 'entries_archive'),
+    'daily_summaries': (SUMMARY_SCHEMA, 'generated_at', 'summary_date', 'daily_summaries_archive'),
+}
+
+class ParquetExporter:
+    def __init__(self, db_config: dict, export_dir: str = None, batch_size: int = None, lag_seconds: int = None):
+        """Export MySQL tables to Parquet, remembering how far each table got"""
+        self.db_config = db_config
+        self.export_dir = export_dir or os.getenv('EXPORT_DIR', 'exports')
+        self.batch_size = batch_size or int(os.getenv('EXPORT_BATCH_SIZE', 50000))
+        # Rows changed more recently than this are left for the next run
+        self.lag_seconds = lag_seconds if lag_seconds is not None else int(os.getenv('EXPORT_LAG_SECONDS', 60))
+        self.watermark_path = os.path.join(self.export_dir, '_watermarks.json')
+        self.watermarks = self._load_watermarks()
+
+    def _load_watermarks(self) -> Dict[str, Dict]:
+        try:
+            with open(self.watermark_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_watermarks(self):
+        os.makedirs(self.export_dir, exist_ok=True)
+        tmp_path = f"{self.watermark_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.watermarks, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.watermark_path)
+
+    @staticmethod
+    def _to_table(rows: List[Dict], schema: pa.Schema) -> pa.Table:
+        for row in rows:
+            for key, value in row.items():
+                # mysql.connector may hand JSON and TEXT back as bytes
+                if isinstance(value, (bytes, bytearray)) and not pa.types.is_fixed_size_binary(schema.field(key).type):
+                    row[key] = value.decode('utf-8')
+        return pa.Table.from_pylist(rows, schema=schema)
+
+    def _rewrite_partition(self, cursor, table: str, day) -> int:
+        """Replace one date partition with its current hot and archived rows"""
+        schema, _, partition_column, archive = INCREMENTAL_TABLES[table]
+        columns = ', '.join(schema.names)
+        # <=> so rows without a date are rewritten like any other partition
+        cursor.execute(f"""
+            SELECT {columns} FROM {table} WHERE {partition_column} <=> %s
+            UNION ALL
+            SELECT {columns} FROM {archive} WHERE {partition_column} <=> %s
+            ORDER BY id
+        """, (day, day))
+        written = 0
+        while True:
+            rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                return written
+            ds.write_dataset(
+                self._to_table(rows, schema),
+                os.path.join(self.export_dir, table),
+                format='parquet',
+                partitioning=ds.partitioning(pa.schema([schema.field(partition_column)]), flavor='hive'),
+                basename_template=f"part-{rows[0]['id']}-{{i}}.parquet",
+                # The first batch clears the date's old files, later ones add to it
+                existing_data_behavior='delete_matching' if not written else 'overwrite_or_ignore',
+                max_partitions=1
+            )
+            written += len(rows)
+
+    def export_incremental(self, conn, table: str) -> int:
+        """Rewrite partitions with rows changed since the table's watermark,
+        returning how many rows were written"""
+        _, ts_column, partition_column, archive = INCREMENTAL_TABLES[table]
+        since = self.watermarks.get(table, {}).get('ts', EPOCH)
+        cursor = conn.cursor(dictionary=True)
+        exported = 0
+        try:
+            # The lag bound keeps in-flight rows for the next run, so a slow
+            # transaction committing an older timestamp can't slip behind the watermark
+            cursor.execute("SELECT NOW() - INTERVAL %s SECOND AS bound", (self.lag_seconds,))
+            bound = cursor.fetchone()['bound'].strftime('%Y-%m-%d %H:%M:%S')
+            cursor.execute(f"""
+                SELECT DISTINCT {partition_column} AS day
+                FROM {table}
+                WHERE {ts_column} > %s AND {ts_column} <= %s
+            """, (since, bound))
+            days = {row['day'] for row in cursor.fetchall()}
+            if since == EPOCH:
+                # A first or --full export also needs the dates archive.py
+                # moved out; archived rows never change, so later runs skip this
+                cursor.execute(f"SELECT DISTINCT {partition_column} AS day FROM {archive}")
+                days.update(row['day'] for row in cursor.fetchall())
+
+            for day in days:
+                exported += self._rewrite_partition(cursor, table, day)
+                print(f"Exported {exported} rows from {table}...")
+            # Only advance once every date is rewritten, so a crashed run redoes them
+            self.watermarks[table] = {'ts': bound}
+            self._save_watermarks()
+            return exported
+        finally:
+            cursor.close()
+
+    def export_feeds(self, conn) -> int:
+        """Rewrite the feeds snapshot, returning the number of feeds"""
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(f"SELECT {', '.join(FEED_SCHEMA.names)} FROM feeds ORDER BY id")
+            table = self._to_table(cursor.fetchall(), FEED_SCHEMA)
+        finally:
+            cursor.close()
+        path = os.path.join(self.export_dir, 'feeds', 'feeds.parquet')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(table, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        return table.num_rows
+
+    def reset(self):
+        """Forget watermarks and remove exported datasets, for a full re-export"""
+        for table in INCREMENTAL_TABLES:
+            shutil.rmtree(os.path.join(self.export_dir, table), ignore_errors=True)
+        self.watermarks = {}
+        self._save_watermarks()
+
+    def run(self) -> Dict[str, int]:
+        conn = mysql.connector.connect(**self.db_config)
+        try:
+            counts = {table: self.export_incremental(conn, table) for table in INCREMENTAL_TABLES}
+            counts['feeds'] = self.export_feeds(conn)
+        finally:
+            conn.close()
+        for table, count in counts.items():
+            print(f"{table}: {count} rows exported")
+        return counts
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Export entries, feeds and daily summaries to Parquet")
+    parser.add_argument('--export-dir', help="Output directory (default: EXPORT_DIR or ./exports)")
+    parser.add_argument('--batch-size', type=int, help="Rows read from MySQL per batch")
+    parser.add_argument('--full', action='store_true', help="Ignore watermarks and export everything again")
+    args = parser.parse_args()
+
+    db_config = {
+        'host': os.getenv('DB_HOST', 'db'),
+        'user': os.getenv('DB_USER', 'rss_user'),
+        'password': os.getenv('DB_PASSWORD', 'rss_password'),
+        'database': os.getenv('DB_NAME', 'rss_feed')
+    }
+    exporter = ParquetExporter(db_config, args.export_dir, args.batch_size)
+    if args.full:
+        exporter.reset()
+    started = datetime.now()
+    exporter.run()
+    print(f"Export finished in {(datetime.now() - started).total_seconds():.1f}s")
+
+if __name__ == "__main__":
+    main()
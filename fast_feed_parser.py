@@ -0,0 +1,150 @@
+import logging
+import time
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from typing import Optional
+
+import feedparser
+
+from date_parsing import FeedDateParser
+
+logger = logging.getLogger(__name__)
+
+try:
+    # Same sanitizer feedparser applies, so summaries stay safe to render as HTML
+    from feedparser.sanitizer import _sanitize_html
+except ImportError:
+    _sanitize_html = None
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+DC = '{http://purl.org/dc/elements/1.1/}'
+
+class UnsupportedFeed(Exception):
+    """Raised when the fast path can't handle a document and feedparser should"""
+
+class FastDict(dict):
+    """dict with attribute access, mirroring feedparser's FeedParserDict"""
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+def _text(elem: Optional[ET.Element]) -> str:
+    if elem is None:
+        return ''
+    return (elem.text or '').strip()
+
+def _clean(value: str) -> str:
+    if '<' not in value:
+        return value
+    if _sanitize_html is None:
+        raise UnsupportedFeed("HTML sanitizer unavailable")
+    return _sanitize_html(value, 'utf-8', 'text/html')
+
+def _date(dates: FeedDateParser, value: str) -> Optional[time.struct_time]:
+    parsed = dates.parse(value)
+    return parsed.utctimetuple() if parsed else None
+
+def _rss_item(item: ET.Element, dates: FeedDateParser) -> FastDict:
+    entry = FastDict()
+    entry['title'] = _clean(_text(item.find('title')))
+    entry['link'] = _text(item.find('link'))
+    summary = _text(item.find('description'))
+    if summary:
+        entry['summary'] = _clean(summary)
+    author = _text(item.find('author')) or _text(item.find(f'{DC}creator'))
+    if author:
+        entry['author'] = author
+    guid = _text(item.find('guid'))
+    if guid:
+        entry['id'] = guid
+    published = _date(dates, _text(item.find('pubDate')))
+    if published:
+        entry['published_parsed'] = published
+    return entry
+
+def _atom_text(elem: Optional[ET.Element]) -> str:
+    # xhtml content is a tree of child elements rather than text; leave it to feedparser
+    if elem is not None and elem.get('type') == 'xhtml':
+        raise UnsupportedFeed("Atom xhtml content")
+    return _text(elem)
+
+def _atom_link(elem: ET.Element) -> str:
+    # rel defaults to alternate; rel="self" points back at the feed itself
+    for link in elem.findall(f'{ATOM}link'):
+        if link.get('rel', 'alternate') == 'alternate':
+            return link.get('href', '')
+    return ''
+
+def _atom_entry(item: ET.Element, dates: FeedDateParser) -> FastDict:
+    entry = FastDict()
+    entry['title'] = _clean(_atom_text(item.find(f'{ATOM}title')))
+    link = _atom_link(item)
+    if link:
+        entry['link'] = link
+    summary = _atom_text(item.find(f'{ATOM}summary')) or _atom_text(item.find(f'{ATOM}content'))
+    if summary:
+        entry['summary'] = _clean(summary)
+    author = _text(item.find(f'{ATOM}author/{ATOM}name'))
+    if author:
+        entry['author'] = author
+    entry_id = _text(item.find(f'{ATOM}id'))
+    if entry_id:
+        entry['id'] = entry_id
+    published = _date(dates, _text(item.find(f'{ATOM}published')))
+    if published:
+        entry['published_parsed'] = published
+    updated = _date(dates, _text(item.find(f'{ATOM}updated')))
+    if updated:
+        entry['updated_parsed'] = updated
+    return entry
+
+def fast_parse(content: bytes) -> FastDict:
+    """Stream-parse a well-formed RSS 2.0 or Atom document, extracting only the
+    fields the scraper stores. Raises UnsupportedFeed for anything else."""
+    entries = []
+    feed_info = FastDict()
+    version = None
+    # One parser per document, so the date format is detected once per feed
+    dates = FeedDateParser()
+    try:
+        for event, elem in ET.iterparse(BytesIO(content), events=('start', 'end')):
+            if event == 'start':
+                if version is None:
+                    if elem.tag == 'rss' and elem.get('version', '').startswith('2.'):
+                        version = 'rss20'
+                    elif elem.tag == f'{ATOM}feed':
+                        version = 'atom10'
+                    else:
+                        raise UnsupportedFeed(f"Unsupported root element: {elem.tag}")
+                continue
+
+            if elem.tag == 'item' and version == 'rss20':
+                entries.append(_rss_item(elem, dates))
+                elem.clear()
+            elif elem.tag == f'{ATOM}entry' and version == 'atom10':
+                entries.append(_atom_entry(elem, dates))
+                elem.clear()
+            elif elem.tag in ('channel', f'{ATOM}feed'):
+                title_tag = 'title' if version == 'rss20' else f'{ATOM}title'
+                feed_info['title'] = _text(elem.find(title_tag))
+                if version == 'rss20':
+                    feed_info['link'] = _text(elem.find('link'))
+                else:
+                    feed_info['link'] = _atom_link(elem)
+    except ET.ParseError as e:
+        raise UnsupportedFeed(f"Malformed XML: {e}")
+
+    if version is None:
+        raise UnsupportedFeed("Empty document")
+    return FastDict(version=version, feed=feed_info, entries=entries)
+
+def parse_feed(content: bytes, fast: bool = True):
+    """Parse feed bytes, using the fast path when possible and feedparser otherwise"""
+    if fast:
+        try:
+            return fast_parse(content)
+        except UnsupportedFeed as e:
+            logger.debug(f"Fast parser fell back to feedparser: {e}")
+    return feedparser.parse(content)
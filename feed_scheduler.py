@@ -0,0 +1,145 @@
+import heapq
+import logging
+import random
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from os import getenv
+from typing import Dict, List, Tuple
+
+from batch_rss_scraper import EntryRecord, FeedProcessor
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class FeedSchedule:
+    """Polling state for a single feed"""
+    feed_id: int
+    feed_url: str
+    interval: float
+    rate: float = 0.0  # Estimated new entries per second
+    last_polled: float = 0.0
+
+class FeedScheduler:
+    def __init__(self, processor: FeedProcessor):
+        """Adaptive polling daemon built on FeedProcessor"""
+        self.processor = processor
+        if not processor.incremental:
+            # The rate estimate counts extracted records as new entries, which
+            # only holds when already-seen entries are skipped
+            logger.warning("INCREMENTAL_EXTRACTION is off; the scheduler turns it on")
+            processor.incremental = True
+            processor.watermarks = processor._load_watermarks()
+        self.min_interval = float(getenv('POLL_MIN_INTERVAL', 300))
+        self.max_interval = float(getenv('POLL_MAX_INTERVAL', 21600))
+        self.jitter = float(getenv('POLL_JITTER', 0.1))
+        self.target_new = float(getenv('POLL_TARGET_NEW', 1.0))
+        self.alpha = float(getenv('POLL_EWMA_ALPHA', 0.3))
+        self.backoff = float(getenv('POLL_BACKOFF', 1.5))
+
+        self.schedules: Dict[str, FeedSchedule] = {}
+        self.queue: List[Tuple[float, str]] = []
+        self.stop_event = threading.Event()
+
+    def load_feeds(self) -> None:
+        """Queue every feed in feeds.csv, staggered over the minimum interval"""
+        now = time.time()
+        for feed_id, feed_url in self.processor.get_feed_list():
+            if feed_url in self.schedules:
+                continue
+            self.schedules[feed_url] = FeedSchedule(feed_id, feed_url, self.min_interval)
+            heapq.heappush(self.queue, (now + random.uniform(0, self.min_interval * self.jitter), feed_url))
+        logger.info(f"Scheduling {len(self.schedules)} feeds")
+
+    def next_interval(self, schedule: FeedSchedule, new_entries: int, now: float) -> float:
+        """Update a feed's publish-rate estimate and derive its next poll interval"""
+        if schedule.last_polled:
+            elapsed = max(now - schedule.last_polled, 1.0)
+            observed = new_entries / elapsed
+            schedule.rate = self.alpha * observed + (1 - self.alpha) * schedule.rate
+        schedule.last_polled = now
+
+        if new_entries == 0 and schedule.rate * schedule.interval < self.target_new:
+            # Quiet feed: back off gradually rather than trusting a near-zero rate
+            interval = schedule.interval * self.backoff
+        elif schedule.rate > 0:
+            # Aim for roughly target_new fresh entries per poll
+            interval = self.target_new / schedule.rate
+        else:
+            interval = self.min_interval
+
+        schedule.interval = min(max(interval, self.min_interval), self.max_interval)
+        return schedule.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _due_feeds(self) -> List[FeedSchedule]:
+        """Pop every feed whose next poll time has passed"""
+        now = time.time()
+        due = []
+        while self.queue and self.queue[0][0] <= now:
+            _, feed_url = heapq.heappop(self.queue)
+            due.append(self.schedules[feed_url])
+        return due
+
+    def poll(self, due: List[FeedSchedule]) -> None:
+        """Poll due feeds concurrently, save their entries and reschedule them"""
+        def worker(feed_id: int, feed_url: str) -> Tuple[str, List[EntryRecord]]:
+            return feed_url, list(self.processor.iter_entries(feed_id, feed_url))
+
+        batch: List[EntryRecord] = []
+        polled = {}
+        for feed_url, records in self.processor.map_feeds(
+                worker, ((s.feed_id, s.feed_url) for s in due)):
+            polled[feed_url] = len(records)
+            batch.extend(records)
+            if len(batch) >= self.processor.chunk_size:
+                self.processor.save_records(batch)
+                batch = []
+        if batch:
+            self.processor.save_records(batch)
+
+        self.processor.save_validators()
+        self.processor.save_watermarks()
+
+        now = time.time()
+        for schedule in due:
+            delay = self.next_interval(schedule, polled.get(schedule.feed_url, 0), now)
+            heapq.heappush(self.queue, (now + delay, schedule.feed_url))
+            logger.debug(
+                f"{schedule.feed_url}: {polled.get(schedule.feed_url, 0)} new, "
+                f"rate {schedule.rate * 3600:.2f}/h, next poll in {delay:.0f}s"
+            )
+        logger.info(f"Polled {len(due)} feeds, {sum(polled.values())} new entries")
+
+    def run(self) -> None:
+        """Poll feeds as they come due until stopped"""
+        self.load_feeds()
+        while not self.stop_event.is_set() and self.queue:
+            due = self._due_feeds()
+            if due:
+                try:
+                    self.poll(due)
+                except Exception as e:
+                    # Keep the daemon alive; failed feeds retry after the minimum interval
+                    logger.error(f"Poll cycle error: {type(e).__name__}")
+                    logger.debug(f"Detailed error: {str(e)}")
+                    retry_at = time.time() + self.min_interval
+                    for schedule in due:
+                        heapq.heappush(self.queue, (retry_at, schedule.feed_url))
+                continue
+            self.stop_event.wait(max(self.queue[0][0] - time.time(), 0))
+        logger.info("Feed scheduler stopped")
+
+    def stop(self, *_) -> None:
+        """Signal handler that ends the polling loop"""
+        self.stop_event.set()
+
+def main():
+    logger.info("=== Starting Feed Scheduler ===")
+    scheduler = FeedScheduler(FeedProcessor())
+    signal.signal(signal.SIGTERM, scheduler.stop)
+    signal.signal(signal.SIGINT, scheduler.stop)
+    scheduler.run()
+
+if __name__ == "__main__":
+    main()
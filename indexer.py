@@ -1,15 +1,66 @@
-from typing import List, Dict
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 import mysql.connector
 from datetime import datetime
+from itertools import islice
+import argparse
+import hashlib
 import json
+import multiprocessing as mp
+import queue
+import threading
+import time
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams
+from qdrant_client.models import (
+    CreateAlias, CreateAliasOperation, DeleteAlias, DeleteAliasOperation,
+    Distance, PointStruct, VectorParams
+)
 from sentence_transformers import SentenceTransformer
+import numpy as np
 import os
 from dotenv import load_dotenv
+from embedding_cache import EmbeddingCache
 
 load_dotenv()
 
+# Chat searches this name; it's an alias for the live physical collection,
+# so a rebuild can be swapped in without a gap
+COLLECTION_NAME = "news_articles"
+MODEL_NAME = 'all-MiniLM-L6-v2'
+VECTOR_SIZE = 384
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to size items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+def article_text(article: Dict) -> str:
+    """Text that gets embedded for an article"""
+    return f"{article['title']} {article['summary'] or ''}"
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+def encoder_worker(tasks, results, threads: int, batch_size: int):
+    """Encoder process: load the model once, then embed (batch_no, texts) tasks until None"""
+    import torch
+    # One core's worth of threads per process; parallelism comes from the processes
+    torch.set_num_threads(threads)
+    encoder = SentenceTransformer(MODEL_NAME)
+    while True:
+        task = tasks.get()
+        if task is None:
+            return
+        batch_no, texts = task
+        try:
+            embeddings = encoder.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+            results.put((batch_no, embeddings, None))
+        except Exception as e:
+            results.put((batch_no, None, repr(e)))
+
 class NewsIndexer:
     def __init__(self):
         self.db_config = {
@@ -18,75 +69,414 @@ class NewsIndexer:
             'password': os.getenv('DB_PASSWORD', 'rss_password'),
             'database': os.getenv('DB_NAME', 'rss_feed')
         }
-        
+
         # Initialize Qdrant client
         self.qdrant = QdrantClient("qdrant", port=6333)
+
+        # Encode in this many worker processes (0 = in this process)
+        self.encoder_processes = int(os.getenv('INDEX_ENCODER_PROCESSES', 0))
+        self.encoder_threads = int(os.getenv('INDEX_ENCODER_THREADS', 1))
         
-        # Initialize sentence transformer
-        self.encoder = SentenceTransformer('all-MiniLM-L6-v2')
+        # Initialize sentence transformer; pipelined runs load it in the workers instead
+        self.encoder = SentenceTransformer(MODEL_NAME) if self.encoder_processes == 0 else None
         
-        # Create collection if it doesn't exist
-        self.qdrant.recreate_collection(
-            collection_name="news_articles",
-            vectors_config=VectorParams(size=384, distance=Distance.COSINE),
+        # Embeddings already computed for identical text, e.g. on a rebuild
+        self.cache = None
+        self._cache_lock = threading.Lock()
+        if os.getenv('EMBEDDING_CACHE', 'true').lower() == 'true':
+            self.cache = EmbeddingCache(MODEL_NAME, VECTOR_SIZE)
+
+        # Texts per encoder forward pass, and points per Qdrant upsert request
+        self.encode_batch_size = int(os.getenv('INDEX_ENCODE_BATCH_SIZE', 64))
+        self.upsert_batch_size = int(os.getenv('INDEX_UPSERT_BATCH_SIZE', 512))
+        # Rows read from MySQL per keyset page
+        self.fetch_page_size = int(os.getenv('INDEX_FETCH_PAGE_SIZE', self.upsert_batch_size))
+        # Don't block on each upsert being applied; Qdrant queues the writes
+        self.wait_for_writes = os.getenv('INDEX_WAIT_FOR_WRITES', 'false').lower() == 'true'
+        # Rows changed more recently than this are indexed but re-read next run,
+        # so a transaction committing an older updated_at can't slip behind the watermark
+        self.lag_seconds = int(os.getenv('INDEX_LAG_SECONDS', 60))
+
+        # Create collection if it doesn't exist; existing vectors are kept
+        self.ensure_collection()
+
+    def _collection_names(self) -> set:
+        return {collection.name for collection in self.qdrant.get_collections().collections}
+
+    def _alias_target(self, alias: str) -> Optional[str]:
+        for existing in self.qdrant.get_aliases().aliases:
+            if existing.alias_name == alias:
+                return existing.collection_name
+        return None
+
+    def _create_collection(self, name: str):
+        self.qdrant.create_collection(
+            collection_name=name,
+            vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
         )
 
-    def fetch_articles(self) -> List[Dict]:
-        """Fetch articles from MySQL"""
+    def ensure_collection(self):
+        """Create the live collection behind the alias if neither exists"""
+        if COLLECTION_NAME in self._collection_names() or self._alias_target(COLLECTION_NAME):
+            return
+        physical = f"{COLLECTION_NAME}_{int(time.time())}"
+        print(f"Creating collection {physical} as {COLLECTION_NAME}")
+        self._create_collection(physical)
+        self.qdrant.update_collection_aliases(change_aliases_operations=[
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=physical, alias_name=COLLECTION_NAME))
+        ])
+        # The new collection is empty, e.g. after the Qdrant volume was lost, so
+        # a watermark left from the old one would keep history out of it
+        self.save_watermark(('1970-01-01 00:00:00', 0))
+
+    def load_watermark(self) -> Tuple[str, int]:
+        """(updated_at, id) of the last entry indexed into the live collection"""
+        try:
+            conn = mysql.connector.connect(**self.db_config)
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT last_updated_at, last_id FROM index_watermarks WHERE collection = %s",
+                (COLLECTION_NAME,)
+            )
+            row = cursor.fetchone()
+            return (row[0].strftime('%Y-%m-%d %H:%M:%S'), row[1]) if row else ('1970-01-01 00:00:00', 0)
+        finally:
+            cursor.close()
+            conn.close()
+
+    def save_watermark(self, watermark: Tuple[str, int]):
+        try:
+            conn = mysql.connector.connect(**self.db_config)
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO index_watermarks (collection, last_updated_at, last_id)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                last_updated_at = VALUES(last_updated_at),
+                last_id = VALUES(last_id)
+            """, (COLLECTION_NAME, watermark[0], watermark[1]))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def lag_bound(self) -> Tuple[str, int]:
+        """Highest watermark safe to save now; rows changed after it may still be committing"""
+        try:
+            conn = mysql.connector.connect(**self.db_config)
+            cursor = conn.cursor()
+            cursor.execute("SELECT NOW() - INTERVAL %s SECOND", (self.lag_seconds,))
+            return (cursor.fetchone()[0].strftime('%Y-%m-%d %H:%M:%S'), 0)
+        finally:
+            cursor.close()
+            conn.close()
+
+    def fetch_articles(self, since: Tuple[str, int] = ('1970-01-01 00:00:00', 0)) -> Iterator[Dict]:
+        """Stream articles added or changed after the since watermark from MySQL.
+
+        Rows are read in keyset pages on (updated_at, id), so memory is bounded
+        by the page size and no long-lived cursor holds the table open.
+        """
         try:
             conn = mysql.connector.connect(**self.db_config)
             cursor = conn.cursor(dictionary=True)
-            
+
             query = """
-                SELECT 
+                SELECT
                     e.id,
                     e.title,
                     e.author as publication,
                     e.link,
                     e.published,
-                    e.summary
+                    e.summary,
+                    e.updated_at
                 FROM entries e
-                ORDER BY e.published DESC
+                WHERE e.is_duplicate = 0
+                AND (e.updated_at > %s OR (e.updated_at = %s AND e.id > %s))
+                ORDER BY e.updated_at, e.id
+                LIMIT %s
             """
-            
-            cursor.execute(query)
-            articles = cursor.fetchall()
-            
-            # Convert datetime objects to strings
-            for article in articles:
-                if article['published']:
-                    article['published'] = article['published'].isoformat()
-            
-            return articles
-            
+
+            while True:
+                cursor.execute(query, (since[0], since[0], since[1], self.fetch_page_size))
+                articles = cursor.fetchall()
+                if not articles:
+                    return
+                # Next page starts after this one; taken before the rows are handed out
+                since = (articles[-1]['updated_at'], articles[-1]['id'])
+
+                # Convert datetime objects to strings
+                for article in articles:
+                    if article['published']:
+                        article['published'] = article['published'].isoformat()
+                    yield article
+
+                if len(articles) < self.fetch_page_size:
+                    return
+
         finally:
             cursor.close()
             conn.close()
 
-    def index_articles(self):
-        """Index articles in Qdrant"""
-        articles = self.fetch_articles()
-        print(f"Fetched {len(articles)} articles")
-        
-        for article in articles:
-            # Create text for embedding
-            text = f"{article['title']} {article['summary'] or ''}"
-            
-            # Generate embedding
-            embedding = self.encoder.encode(text).tolist()
-            
-            # Store in Qdrant
-            self.qdrant.upsert(
-                collection_name="news_articles",
-                points=[{
-                    "id": article['id'],
-                    "vector": embedding,
-                    "payload": article
-                }]
-            )
-            
-        print("Indexing complete!")
+    def _indexed_hashes(self, collection: str, ids: List[int]) -> Dict[int, str]:
+        points = self.qdrant.retrieve(
+            collection_name=collection,
+            ids=ids,
+            with_payload=['content_hash'],
+            with_vectors=False
+        )
+        return {point.id: (point.payload or {}).get('content_hash') for point in points}
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        return self.encoder.encode(
+            texts,
+            batch_size=self.encode_batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+    def _prepare(self, batch: List[Dict], collection: str, full: bool) -> Tuple[List[Dict], Tuple[str, int], int]:
+        """Hash a fetched batch and drop articles whose indexed vectors are current.
+
+        Returns the articles still to embed, the watermark after the batch and
+        how many were skipped.
+        """
+        last = batch[-1]
+        watermark = (last['updated_at'].strftime('%Y-%m-%d %H:%M:%S'), last['id'])
+        for article in batch:
+            article.pop('updated_at')
+            article['content_hash'] = content_hash(article_text(article))
+
+        if full:
+            return batch, watermark, 0
+        # Touched rows whose embedded text didn't change keep their vectors
+        existing = self._indexed_hashes(collection, [article['id'] for article in batch])
+        changed = [article for article in batch if existing.get(article['id']) != article['content_hash']]
+        return changed, watermark, len(batch) - len(changed)
+
+    def _lookup_cached(self, articles: List[Dict]) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        """Cached vectors for articles, plus the positions that still need encoding"""
+        if self.cache is None:
+            return [None] * len(articles), list(range(len(articles)))
+        # lookup() returns copies, so these stay valid after the lock is released
+        # even if the writer thread's put_many evicts and reuses their slots
+        with self._cache_lock:
+            cached = self.cache.lookup([bytes.fromhex(article['content_hash']) for article in articles])
+        return cached, [i for i, vector in enumerate(cached) if vector is None]
+
+    def _complete(self, articles: List[Dict], cached: List[Optional[np.ndarray]],
+                  missing: List[int], encoded) -> np.ndarray:
+        """Merge freshly encoded vectors into the cached ones, remembering them"""
+        if missing and self.cache is not None:
+            with self._cache_lock:
+                self.cache.put_many([bytes.fromhex(articles[i]['content_hash']) for i in missing], encoded)
+        for i, vector in zip(missing, encoded):
+            cached[i] = vector
+        return np.vstack(cached)
+
+    def embed(self, articles: List[Dict]) -> np.ndarray:
+        """Embeddings for articles, encoding only text the cache hasn't seen"""
+        cached, missing = self._lookup_cached(articles)
+        encoded = self._encode([article_text(articles[i]) for i in missing]) if missing else []
+        return self._complete(articles, cached, missing, encoded)
+
+    def _write(self, collection: str, articles: List[Dict], embeddings: np.ndarray):
+        # Store in Qdrant with one request per batch
+        self.qdrant.upsert(
+            collection_name=collection,
+            points=[
+                PointStruct(id=article['id'], vector=embedding.tolist(), payload=article)
+                for article, embedding in zip(articles, embeddings)
+            ],
+            wait=self.wait_for_writes
+        )
+
+    def _finish(self, indexed: int, skipped: int):
+        if self.cache is not None:
+            self.cache.flush()
+            print(f"Embedding cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        print(f"Indexing complete! {indexed + skipped} new or changed articles read")
+
+    def index_articles(self, collection: str = COLLECTION_NAME, full: bool = False):
+        """Index new and changed articles in Qdrant.
+
+        With full=True every article is embedded into collection and the
+        watermark is neither read nor saved; rebuild() uses this.
+
+        Everything up to now is indexed, but the returned and saved watermark
+        stops at lag_bound(), so the most recent rows are read again next run
+        and skipped by their content hash if nothing changed.
+        """
+        watermark = ('1970-01-01 00:00:00', 0) if full else self.load_watermark()
+        bound = self.lag_bound()
+        if self.encoder_processes > 0:
+            return self._index_pipelined(collection, full, watermark, bound)
+
+        indexed = 0
+        skipped = 0
+        for batch in batched(self.fetch_articles(watermark), self.upsert_batch_size):
+            batch, watermark, batch_skipped = self._prepare(batch, collection, full)
+            skipped += batch_skipped
+            if batch:
+                # Generate embeddings for the whole batch in a few forward passes
+                self._write(collection, batch, self.embed(batch))
+                indexed += len(batch)
+
+            if not full:
+                self.save_watermark(min(watermark, bound))
+            print(f"Indexed {indexed} articles ({skipped} unchanged)")
+
+        self._finish(indexed, skipped)
+        return min(watermark, bound)
+
+    def _index_pipelined(self, collection: str, full: bool, watermark: Tuple[str, int],
+                         bound: Tuple[str, int]):
+        """Index with reading, encoding and writing overlapped.
+
+        This thread reads and prepares batches, encoder processes embed them
+        and a writer thread upserts to Qdrant. The task queue and an in-flight
+        limit are bounded, so the slowest stage holds the others back instead
+        of letting batches pile up in memory.
+        """
+        ctx = mp.get_context('spawn')
+        tasks = ctx.Queue(maxsize=self.encoder_processes * 2)
+        results = ctx.Queue()
+        workers = [
+            ctx.Process(target=encoder_worker, args=(tasks, results, self.encoder_threads, self.encode_batch_size),
+                        daemon=True)
+            for _ in range(self.encoder_processes)
+        ]
+        for worker in workers:
+            worker.start()
+        print(f"Started {len(workers)} encoder processes")
+
+        in_flight = threading.BoundedSemaphore(self.encoder_processes * 4)
+        pending: Dict[int, tuple] = {}
+        pending_lock = threading.Lock()
+        state = {'total': None, 'written': 0, 'indexed': 0, 'watermark': watermark, 'error': None}
+
+        def write_results():
+            finished: Dict[int, Tuple[str, int]] = {}
+            next_batch = 0
+            try:
+                while state['total'] is None or state['written'] < state['total']:
+                    try:
+                        batch_no, encoded, error = results.get(timeout=1)
+                    except queue.Empty:
+                        if not all(worker.is_alive() for worker in workers):
+                            raise RuntimeError("An encoder process exited unexpectedly")
+                        continue
+                    if error:
+                        raise RuntimeError(f"Encoder failed: {error}")
+
+                    with pending_lock:
+                        articles, cached, missing, batch_watermark = pending.pop(batch_no)
+                    if articles:
+                        self._write(collection, articles, self._complete(articles, cached, missing, encoded))
+                        state['indexed'] += len(articles)
+
+                    # Batches finish out of order; the watermark only moves
+                    # past a batch once every batch before it is written too
+                    finished[batch_no] = batch_watermark
+                    while next_batch in finished:
+                        state['watermark'] = finished.pop(next_batch)
+                        next_batch += 1
+                        if not full:
+                            self.save_watermark(min(state['watermark'], bound))
+                    state['written'] += 1
+                    in_flight.release()
+                    print(f"Indexed {state['indexed']} articles")
+            except Exception as e:
+                state['error'] = e
+
+        writer = threading.Thread(target=write_results, daemon=True)
+        writer.start()
+
+        def check_writer():
+            if state['error'] is not None:
+                raise state['error']
+
+        skipped = 0
+        total = 0
+        try:
+            for batch_no, batch in enumerate(batched(self.fetch_articles(watermark), self.upsert_batch_size)):
+                while not in_flight.acquire(timeout=1):
+                    check_writer()
+                articles, batch_watermark, batch_skipped = self._prepare(batch, collection, full)
+                skipped += batch_skipped
+                cached, missing = self._lookup_cached(articles)
+                with pending_lock:
+                    pending[batch_no] = (articles, cached, missing, batch_watermark)
+
+                if missing:
+                    task = (batch_no, [article_text(articles[i]) for i in missing])
+                    while True:
+                        try:
+                            tasks.put(task, timeout=1)
+                            break
+                        except queue.Full:
+                            check_writer()
+                else:
+                    # Nothing to encode; hand straight to the writer
+                    results.put((batch_no, [], None))
+                total = batch_no + 1
+
+            state['total'] = total
+            writer.join()
+            check_writer()
+        finally:
+            state['total'] = total if state['total'] is None else state['total']
+            for _ in workers:
+                try:
+                    tasks.put_nowait(None)
+                except queue.Full:
+                    break
+            for worker in workers:
+                worker.join(timeout=10)
+                if worker.is_alive():
+                    worker.terminate()
+
+        self._finish(state['indexed'], skipped)
+        return min(state['watermark'], bound)
+
+    def rebuild(self):
+        """Re-embed everything into a shadow collection, then swap the alias to it"""
+        shadow = f"{COLLECTION_NAME}_{int(time.time())}"
+        print(f"Rebuilding into {shadow}")
+        self._create_collection(shadow)
+        # Wait for the last writes so the swapped-in collection is complete
+        wait_for_writes, self.wait_for_writes = self.wait_for_writes, True
+        try:
+            watermark = self.index_articles(collection=shadow, full=True)
+        finally:
+            self.wait_for_writes = wait_for_writes
+
+        previous = self._alias_target(COLLECTION_NAME)
+        if previous is None and COLLECTION_NAME in self._collection_names():
+            # Pre-alias deployments have a physical collection under the alias
+            # name; it has to go before the alias can take its place
+            self.qdrant.delete_collection(COLLECTION_NAME)
+
+        # Delete and create in one request, so searches never see a missing alias
+        operations = []
+        if previous:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=COLLECTION_NAME)))
+        operations.append(CreateAliasOperation(create_alias=CreateAlias(collection_name=shadow, alias_name=COLLECTION_NAME)))
+        self.qdrant.update_collection_aliases(change_aliases_operations=operations)
+        self.save_watermark(watermark)
+
+        if previous:
+            self.qdrant.delete_collection(previous)
+        print(f"{COLLECTION_NAME} now points at {shadow}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Index articles into Qdrant")
+    parser.add_argument('--rebuild', action='store_true',
+                        help="Re-embed everything into a new collection and swap it in")
+    args = parser.parse_args()
+
     indexer = NewsIndexer()
-    indexer.index_articles() 
\ No newline at end of file
+    if args.rebuild:
+        indexer.rebuild()
+    else:
+        indexer.index_articles()
\ No newline at end of file
@@ -1,19 +1,41 @@
 CREATE DATABASE IF NOT EXISTS rss_feed;
 USE rss_feed;
 
+CREATE TABLE IF NOT EXISTS feeds (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    title VARCHAR(255),
+    link VARCHAR(255),
+    feed_url VARCHAR(255) NOT NULL UNIQUE,
+    description TEXT,
+    author VARCHAR(255),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
 CREATE TABLE IF NOT EXISTS entries (
     id INT AUTO_INCREMENT PRIMARY KEY,
     feed_id INT NOT NULL,
     title VARCHAR(255) NOT NULL,
-    link VARCHAR(255) NOT NULL UNIQUE,
+    link TEXT NOT NULL,
+    -- Fixed-width uniqueness key, so long links are stored whole and the index stays small
+    link_hash BINARY(16) AS (UNHEX(MD5(link))) STORED,
     published DATETIME,
+    -- Stored so per-day filters can use an index instead of DATE(published)
+    published_date DATE AS (DATE(published)) STORED,
     author VARCHAR(255),
     entry_id VARCHAR(255),
     summary TEXT,
     publication VARCHAR(255),
+    simhash BIGINT UNSIGNED NULL,
+    is_duplicate TINYINT(1) NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    UNIQUE INDEX uk_link_hash (link_hash),
     INDEX idx_feed_id (feed_id),
-    INDEX idx_published (published)
+    INDEX idx_published (published),
+    INDEX idx_published_date (published_date, is_duplicate, published),
+    INDEX idx_created_simhash (created_at, simhash),
+    FULLTEXT INDEX ft_title_summary (title, summary),
+    INDEX idx_updated_at (updated_at)
 ) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
 
 CREATE TABLE IF NOT EXISTS daily_summaries (
@@ -25,4 +47,63 @@ CREATE TABLE IF NOT EXISTS daily_summaries (
     publications JSON,
     articles JSON,
     UNIQUE KEY unique_date (summary_date)
-) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci; 
\ No newline at end of file
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS feed_validators (
+    feed_url VARCHAR(255) PRIMARY KEY,
+    etag VARCHAR(255),
+    last_modified VARCHAR(64),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS feed_watermarks (
+    feed_url VARCHAR(255) PRIMARY KEY,
+    last_published DATETIME,
+    recent_ids TEXT,
+    entries_seen BIGINT NOT NULL DEFAULT 0,
+    entries_skipped BIGINT NOT NULL DEFAULT 0,
+    skip_rate DOUBLE AS (entries_skipped / NULLIF(entries_seen, 0)) VIRTUAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci; 
+-- How far indexer.py has embedded entries into each Qdrant collection
+CREATE TABLE IF NOT EXISTS index_watermarks (
+    collection VARCHAR(64) PRIMARY KEY,
+    last_updated_at TIMESTAMP NULL,
+    last_id INT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+-- Cold tier for rows moved out by archive.py; compressed, and off the hot
+-- tables' buffer pool working set. Generated columns are stored as plain
+-- copies so rows can be moved with INSERT ... SELECT.
+CREATE TABLE IF NOT EXISTS entries_archive (
+    id INT PRIMARY KEY,
+    feed_id INT NOT NULL,
+    title VARCHAR(255) NOT NULL,
+    link TEXT NOT NULL,
+    link_hash BINARY(16) NOT NULL,
+    published DATETIME,
+    published_date DATE,
+    author VARCHAR(255),
+    entry_id VARCHAR(255),
+    summary TEXT,
+    publication VARCHAR(255),
+    simhash BIGINT UNSIGNED NULL,
+    is_duplicate TINYINT(1) NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_published_date (published_date, is_duplicate, published),
+    INDEX idx_link_hash (link_hash)
+) ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8 CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
+
+CREATE TABLE IF NOT EXISTS daily_summaries_archive (
+    id INT PRIMARY KEY,
+    summary_date DATE NOT NULL,
+    summary_text TEXT NOT NULL,
+    article_count INT NOT NULL,
+    generated_at TIMESTAMP NULL,
+    publications JSON,
+    articles JSON,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY unique_date (summary_date)
+) ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8 CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;
\ No newline at end of file
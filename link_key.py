@@ -0,0 +1,17 @@
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+def normalize_link(link: str) -> str:
+    """Canonical form of an entry link: trimmed, lowercase scheme and host, no fragment"""
+    link = (link or '').strip()
+    try:
+        parts = urlsplit(link)
+    except ValueError:
+        return link
+    if not parts.scheme or not parts.netloc:
+        return link
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ''))
+
+def link_hash(link: str) -> bytes:
+    """16-byte key matching entries.link_hash, i.e. UNHEX(MD5(link)) in MySQL"""
+    return hashlib.md5(link.encode('utf-8')).digest()
@@ -0,0 +1,168 @@
+"""Bring an existing rss_feed database up to the schema in init.sql.
+
+init.sql only creates missing tables, so columns and indexes added to
+existing tables are applied here. Every step checks information_schema
+first, so the script is safe to run on every start.
+"""
+import os
+from typing import Callable, List, Tuple, Union
+
+import mysql.connector
+from dotenv import load_dotenv
+
+from link_key import link_hash, normalize_link
+
+def column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+def index_exists(cursor, table: str, index: str) -> bool:
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+def normalize_entry_links(conn, batch_size: int = 1000) -> None:
+    """Rewrite entries.link into normalize_link form, keeping the lowest id of
+    each set of rows that normalize to the same link and deleting the rest.
+
+    Runs after the old UNIQUE(link) index is gone, so rows can briefly share a
+    link, and before uk_link_hash exists, so the new key is added over clean
+    data. Safe to rerun: already-normalized rows are left alone.
+    """
+    cursor = conn.cursor()
+    seen = set()
+    last_id = 0
+    updated = deleted = 0
+    try:
+        while True:
+            cursor.execute(
+                "SELECT id, link FROM entries WHERE id > %s ORDER BY id LIMIT %s",
+                (last_id, batch_size)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            updates, duplicates = [], []
+            for entry_id, link in rows:
+                normalized = normalize_link(link)
+                key = link_hash(normalized)
+                if key in seen:
+                    duplicates.append(entry_id)
+                    continue
+                seen.add(key)
+                if normalized != link:
+                    updates.append((normalized, entry_id))
+
+            if updates:
+                cursor.executemany("UPDATE entries SET link = %s WHERE id = %s", updates)
+            if duplicates:
+                placeholders = ', '.join(['%s'] * len(duplicates))
+                cursor.execute(f"DELETE FROM entries WHERE id IN ({placeholders})", duplicates)
+            conn.commit()
+            updated += len(updates)
+            deleted += len(duplicates)
+        print(f"Normalized {updated} links, removed {deleted} duplicate entries")
+    finally:
+        cursor.close()
+
+# (description, already-applied check, statements). A statement may also be a
+# callable taking the connection, for data fixes that can't be a single query.
+MIGRATIONS: List[Tuple[str, Callable, List[Union[str, Callable]]]] = [
+    (
+        "entries: near-duplicate fingerprint columns",
+        lambda cursor: column_exists(cursor, 'entries', 'simhash'),
+        [
+            "ALTER TABLE entries "
+            "ADD COLUMN simhash BIGINT UNSIGNED NULL, "
+            "ADD COLUMN is_duplicate TINYINT(1) NOT NULL DEFAULT 0, "
+            "ADD INDEX idx_created_simhash (created_at, simhash)"
+        ]
+    ),
+    (
+        "entries: stored published_date column for per-day queries",
+        lambda cursor: column_exists(cursor, 'entries', 'published_date'),
+        [
+            "ALTER TABLE entries "
+            "ADD COLUMN published_date DATE AS (DATE(published)) STORED AFTER published, "
+            "ADD INDEX idx_published_date (published_date, is_duplicate, published)"
+        ]
+    ),
+    (
+        "entries: drop UNIQUE VARCHAR(255) link index, allow longer links",
+        lambda cursor: not index_exists(cursor, 'entries', 'link'),
+        [
+            "ALTER TABLE entries DROP INDEX link, MODIFY link TEXT NOT NULL"
+        ]
+    ),
+    (
+        "entries: normalized links with a hashed unique key",
+        lambda cursor: column_exists(cursor, 'entries', 'link_hash'),
+        [
+            # Links stored before normalization would otherwise hash differently
+            # from the normalized links the scrapers now insert
+            normalize_entry_links,
+            "ALTER TABLE entries "
+            "ADD COLUMN link_hash BINARY(16) AS (UNHEX(MD5(link))) STORED AFTER link, "
+            "ADD UNIQUE INDEX uk_link_hash (link_hash)"
+        ]
+    ),
+    (
+        "entries: FULLTEXT index for /api/search",
+        lambda cursor: index_exists(cursor, 'entries', 'ft_title_summary'),
+        [
+            "ALTER TABLE entries ADD FULLTEXT INDEX ft_title_summary (title, summary)"
+        ]
+    ),
+    (
+        "entries: updated_at for incremental vector indexing",
+        lambda cursor: column_exists(cursor, 'entries', 'updated_at'),
+        [
+            "ALTER TABLE entries "
+            "ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP AFTER created_at, "
+            "ADD INDEX idx_updated_at (updated_at)"
+        ]
+    ),
+]
+
+def migrate(db_config: dict) -> int:
+    """Apply pending migrations, returning how many ran"""
+    conn = mysql.connector.connect(**db_config)
+    cursor = conn.cursor()
+    applied = 0
+    try:
+        for description, is_applied, statements in MIGRATIONS:
+            if is_applied(cursor):
+                continue
+            print(f"Applying migration: {description}")
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    cursor.execute(statement)
+            conn.commit()
+            applied += 1
+        print(f"Migrations complete ({applied} applied)")
+        return applied
+    finally:
+        cursor.close()
+        conn.close()
+
+def main():
+    load_dotenv()
+    db_config = {
+        'host': os.getenv('DB_HOST', 'db'),
+        'user': os.getenv('DB_USER', 'rss_user'),
+        'password': os.getenv('DB_PASSWORD', 'rss_password'),
+        'database': os.getenv('DB_NAME', 'rss_feed')
+    }
+    migrate(db_config)
+
+if __name__ == "__main__":
+    main()
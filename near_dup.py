@@ -0,0 +1,83 @@
+import hashlib
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+TAG_RE = re.compile(r'<[^>]+>')
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+def simhash(text: str, shingle_size: int = 3, max_chars: int = 2000) -> Optional[int]:
+    """64-bit SimHash over word shingles of text, or None if text is too short"""
+    words = WORD_RE.findall(TAG_RE.sub(' ', text[:max_chars]).lower())
+    if len(words) < shingle_size * 2:
+        return None
+
+    hashes = [
+        hashlib.blake2b(' '.join(words[i:i + shingle_size]).encode('utf-8'), digest_size=8).digest()
+        for i in range(len(words) - shingle_size + 1)
+    ]
+
+    # Majority vote per bit position, counted column-wise over the bit strings
+    half = len(hashes) / 2
+    fingerprint = 0
+    for column in zip(*(format(int.from_bytes(h, 'big'), '064b') for h in hashes)):
+        fingerprint = (fingerprint << 1) | (column.count('1') > half)
+    return fingerprint
+
+class SimHashIndex:
+    def __init__(self, max_distance: int = 3, window_seconds: float = 3 * 86400):
+        """Sliding-window index of fingerprints, matched within a Hamming distance.
+
+        Fingerprints are split into max_distance + 1 bands; by the pigeonhole
+        principle any two within max_distance bits agree exactly on one band.
+        """
+        self.max_distance = max_distance
+        self.window_seconds = window_seconds
+        self.bands = max_distance + 1
+        self.band_bits = 64 // self.bands
+        self._buckets: List[Dict[int, List[int]]] = [defaultdict(list) for _ in range(self.bands)]
+        self._added: Deque[Tuple[float, int]] = deque()
+        self._lock = threading.Lock()
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.bands)]
+
+    def _evict(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._added and self._added[0][0] < cutoff:
+            _, fingerprint = self._added.popleft()
+            for bucket, value in zip(self._buckets, self._band_values(fingerprint)):
+                candidates = bucket.get(value)
+                if candidates:
+                    candidates.remove(fingerprint)
+                    if not candidates:
+                        del bucket[value]
+
+    def add(self, fingerprint: int, added_at: Optional[float] = None) -> None:
+        """Add a fingerprint without checking it (e.g. when warming from the DB)"""
+        added_at = time.time() if added_at is None else added_at
+        with self._lock:
+            self._added.append((added_at, fingerprint))
+            for bucket, value in zip(self._buckets, self._band_values(fingerprint)):
+                bucket[value].append(fingerprint)
+
+    def check_and_add(self, fingerprint: int) -> bool:
+        """Return True if a near-duplicate is already indexed; index it either way"""
+        now = time.time()
+        with self._lock:
+            self._evict(now)
+            duplicate = any(
+                bin(fingerprint ^ candidate).count('1') <= self.max_distance
+                for bucket, value in zip(self._buckets, self._band_values(fingerprint))
+                for candidate in bucket.get(value, ())
+            )
+            self._added.append((now, fingerprint))
+            for bucket, value in zip(self._buckets, self._band_values(fingerprint)):
+                bucket[value].append(fingerprint)
+        return duplicate
+
+    def __len__(self) -> int:
+        return len(self._added)
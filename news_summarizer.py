@@ -27,10 +27,10 @@ class NewsDigest:
             
             query = """
                 SELECT 
-                    DATE(MIN(published)) as earliest_date,
-                    DATE(MAX(published)) as latest_date
+                    MIN(published_date) as earliest_date,
+                    MAX(published_date) as latest_date
                 FROM entries
-                WHERE published IS NOT NULL
+                WHERE published_date IS NOT NULL
             """
             
             cursor.execute(query)
@@ -58,7 +58,8 @@ class NewsDigest:
                     f.title as publication
                 FROM entries e
                 JOIN feeds f ON e.feed_id = f.id
-                WHERE DATE(e.published) = %s
+                WHERE e.published_date = %s
+                AND e.is_duplicate = 0
                 ORDER BY e.published DESC
             """
             
@@ -1,49 +1,79 @@
+import argparse
+import csv
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import feedparser
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 import mysql.connector
 from mysql.connector import Error
+from mysql.connector.pooling import MySQLConnectionPool
+from date_parsing import FeedDateParser
+from link_key import link_hash, normalize_link
+
+# mysql.connector caps a pool at 32 connections
+MAX_POOL_SIZE = 32
 
 class SubstackRSSParser:
-    def __init__(self, url: str, db_config: Dict):
+    def __init__(self, url: str, db_config: Dict, batch_size: int = 500,
+                 pool: Optional[MySQLConnectionPool] = None):
         """
         Initialize the parser with RSS feed URL and database configuration.
         
         Args:
             url: RSS feed URL
             db_config: Dictionary containing MySQL connection parameters
+            batch_size: Number of entries written per multi-row upsert
+            pool: Shared connection pool; connections are borrowed from it
+                instead of opened per parser
         """
         self.url = url
         self.feed = None
         self.db_config = db_config
         self.connection = None
+        self.batch_size = batch_size
+        self.pool = pool
+        self.date_parser = FeedDateParser()
 
     def connect_to_db(self):
         """Establish database connection."""
         try:
-            self.connection = mysql.connector.connect(**self.db_config)
+            if self.pool is not None:
+                self.close_db()
+                self.connection = self.pool.get_connection()
+            else:
+                self.connection = mysql.connector.connect(**self.db_config)
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
             raise
 
     def close_db(self):
-        """Close database connection."""
-        if self.connection and self.connection.is_connected():
+        """Close database connection, or hand it back to the pool."""
+        if self.connection is None:
+            return
+        if self.pool is not None:
+            # Closing a pooled connection returns it to the pool
+            self.connection.close()
+        elif self.connection.is_connected():
             self.connection.close()
+        self.connection = None
 
     def save_to_db(self, feed_data: Dict):
-        """Save parsed feed data to MySQL database."""
+        """Save parsed feed data to MySQL database in a single transaction."""
         if not self.connection or not self.connection.is_connected():
             self.connect_to_db()
 
         cursor = self.connection.cursor()
         
         try:
-            # Insert feed data
+            # Insert feed data; LAST_INSERT_ID(id) makes lastrowid the feed id
+            # whether the row was inserted or updated
             feed_query = """
                 INSERT INTO feeds (title, link, feed_url, description, author)
                 VALUES (%s, %s, %s, %s, %s)
                 ON DUPLICATE KEY UPDATE
+                id = LAST_INSERT_ID(id),
                 title = VALUES(title),
                 link = VALUES(link),
                 description = VALUES(description),
@@ -57,15 +87,10 @@ class SubstackRSSParser:
                 feed_data['author']
             )
             cursor.execute(feed_query, feed_values)
+            feed_id = cursor.lastrowid
             
-            # Get feed_id either from insert or existing record
-            if cursor.lastrowid:
-                feed_id = cursor.lastrowid
-            else:
-                cursor.execute("SELECT id FROM feeds WHERE feed_url = %s", (self.url,))
-                feed_id = cursor.fetchone()[0]
-            
-            # Insert entries
+            # Insert entries in batches; executemany sends each batch as one
+            # multi-row INSERT instead of a round-trip per entry
             entry_query = """
                 INSERT INTO entries (feed_id, title, link, published, author, entry_id, summary)
                 VALUES (%s, %s, %s, %s, %s, %s, %s)
@@ -76,8 +101,18 @@ class SubstackRSSParser:
                 summary = VALUES(summary)
             """
             
-            for entry in feed_data['entries']:
-                entry_values = (
+            # Collapse repeats on the uk_link_hash key the upsert resolves against
+            entries = {link_hash(entry['link']): entry for entry in feed_data['entries']}
+            if entries:
+                # Archived links are no longer under uk_link_hash; don't bring them back
+                cursor.execute(
+                    f"SELECT link_hash FROM entries_archive WHERE link_hash IN ({', '.join(['%s'] * len(entries))})",
+                    list(entries)
+                )
+                for (archived,) in cursor.fetchall():
+                    entries.pop(bytes(archived), None)
+            entry_values = [
+                (
                     feed_id,
                     entry['title'],
                     entry['link'],
@@ -86,7 +121,10 @@ class SubstackRSSParser:
                     entry['id'],
                     entry['summary']
                 )
-                cursor.execute(entry_query, entry_values)
+                for entry in entries.values()
+            ]
+            for start in range(0, len(entry_values), self.batch_size):
+                cursor.executemany(entry_query, entry_values[start:start + self.batch_size])
             
             self.connection.commit()
             
@@ -100,6 +138,7 @@ class SubstackRSSParser:
     def parse(self) -> Dict:
         """Parse the RSS feed and return structured data."""
         self.feed = feedparser.parse(self.url)
+        self.date_parser = FeedDateParser()
         
         # Extract feed metadata
         feed_info = {
@@ -119,7 +158,7 @@ class SubstackRSSParser:
         for entry in self.feed.entries:
             parsed_entry = {
                 'title': self._clean_cdata(entry.get('title', '')),
-                'link': entry.get('link', ''),
+                'link': normalize_link(entry.get('link', '')),
                 'published': self._parse_date(entry.get('published', '')),
                 'author': entry.get('author', ''),
                 'id': entry.get('id', ''),
@@ -134,14 +173,75 @@ class SubstackRSSParser:
         text = text.replace('<![CDATA[', '').replace(']]>', '')
         return text.strip()
 
-    def _parse_date(self, date_str: str) -> datetime:
-        """Parse date string to datetime object."""
-        try:
-            return datetime.strptime(date_str, '%a, %d %b %Y %H:%M:%S %Z')
-        except ValueError:
-            return None
+    def _parse_date(self, date_str: str) -> Optional[datetime]:
+        """Parse date string to a naive UTC datetime, reusing the feed's detected format."""
+        return self.date_parser.parse(date_str)
+
+class MultiFeedRunner:
+    def __init__(self, urls: List[str], db_config: Dict, workers: int = 8, batch_size: int = 500):
+        """
+        Parse many feeds concurrently and write them through a shared pool.
+        
+        Args:
+            urls: RSS feed URLs
+            db_config: Dictionary containing MySQL connection parameters
+            workers: Number of feeds fetched and parsed at once
+            batch_size: Number of entries written per multi-row upsert
+        """
+        self.urls = urls
+        self.db_config = db_config
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        
+        # Workers beyond the pool size keep parsing and queue for a connection
+        pool_size = min(self.workers, MAX_POOL_SIZE)
+        self.pool = MySQLConnectionPool(pool_name='rss_parser', pool_size=pool_size, **db_config)
+        self.db_slots = threading.BoundedSemaphore(pool_size)
+
+    def process(self, url: str) -> int:
+        """Parse one feed and save it, returning the number of entries."""
+        parser = SubstackRSSParser(url, self.db_config, self.batch_size, pool=self.pool)
+        feed_data = parser.parse()
+        with self.db_slots:
+            try:
+                parser.save_to_db(feed_data)
+            finally:
+                parser.close_db()
+        return len(feed_data['entries'])
+
+    def run(self) -> Dict[str, int]:
+        """Process every feed, returning entry counts keyed by URL."""
+        results = {}
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.process, url): url for url in self.urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                    print(f"Saved {results[url]} entries from {url}")
+                except Exception as e:
+                    print(f"Error processing {url}: {e}")
+        
+        elapsed = time.time() - start
+        total = sum(results.values())
+        print(f"Processed {len(results)}/{len(self.urls)} feeds, {total} entries "
+              f"in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} entries/s)")
+        return results
+
+def load_feed_urls(csv_path: str) -> List[str]:
+    """Read feed URLs from a CSV file with a feed_url column."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        return [row['feed_url'].strip() for row in csv.DictReader(f) if row.get('feed_url')]
 
 def main():
+    arg_parser = argparse.ArgumentParser(description="Parse RSS feeds into MySQL")
+    arg_parser.add_argument('urls', nargs='*', help="Feed URLs (default: the example podcast feed)")
+    arg_parser.add_argument('--csv', help="Read feed URLs from a CSV file with a feed_url column")
+    arg_parser.add_argument('--workers', type=int, default=8, help="Feeds parsed concurrently")
+    arg_parser.add_argument('--batch-size', type=int, default=500, help="Entries per multi-row upsert")
+    args = arg_parser.parse_args()
+
     # Database configuration
     db_config = {
         'host': 'localhost',
@@ -150,9 +250,16 @@ def main():
         'database': 'rss_feed'
     }
 
+    urls = list(args.urls)
+    if args.csv:
+        urls.extend(load_feed_urls(args.csv))
+    if len(urls) > 1:
+        MultiFeedRunner(urls, db_config, args.workers, args.batch_size).run()
+        return
+
     # Example usage
-    url = "https://api.substack.com/feed/podcast/1810164.rss"
-    parser = SubstackRSSParser(url, db_config)
+    url = urls[0] if urls else "https://api.substack.com/feed/podcast/1810164.rss"
+    parser = SubstackRSSParser(url, db_config, args.batch_size)
     
     try:
         feed_data = parser.parse()
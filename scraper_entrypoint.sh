@@ -23,6 +23,10 @@ echo "Initializing database schema..."
 mysql -h db -u rss_user -prss_password rss_feed < /app/init.sql
 echo "Schema initialized!"
 
+# Apply schema changes to existing databases
+echo "Running migrations..."
+python migrate.py
+
 # Run RSS scraper
 echo "Starting RSS feed scraper..."
 python batch_rss_scraper.py
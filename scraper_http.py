@@ -0,0 +1,171 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+from os import getenv
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode br responses)
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/rss+xml, application/xml, application/atom+xml, text/xml;q=0.9, */*;q=0.8',
+    'Accept-Encoding': ACCEPT_ENCODING
+}
+
+class ResponseTooLarge(RequestException):
+    """Raised when a response body exceeds the configured size cap"""
+
+class HostStats:
+    def __init__(self):
+        """Thread-safe per-host connection and request timings"""
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def record_connect(self, host: str, tcp_time: float, tls_time: float) -> None:
+        with self._lock:
+            stats = self._hosts[host]
+            stats['connections'] += 1
+            stats['tcp_time'] += tcp_time
+            stats['tls_time'] += tls_time
+
+    def record_request(self, host: str, ttfb: float, download_time: float, size: int) -> None:
+        with self._lock:
+            stats = self._hosts[host]
+            stats['requests'] += 1
+            stats['ttfb_time'] += ttfb
+            stats['download_time'] += download_time
+            stats['bytes'] += size
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Copy of the accumulated stats keyed by host"""
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._hosts.items()}
+
+def _timed_connection(base, stats: HostStats):
+    """Subclass a urllib3 connection class to time TCP connect and TLS handshake"""
+    class TimedConnection(base):
+        def _new_conn(self):
+            start = time.perf_counter()
+            sock = super()._new_conn()
+            self._tcp_time = time.perf_counter() - start
+            return sock
+
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            total = time.perf_counter() - start
+            tcp_time = getattr(self, '_tcp_time', total)
+            stats.record_connect(self.host, tcp_time, max(total - tcp_time, 0.0))
+
+    return TimedConnection
+
+class TimedHTTPAdapter(HTTPAdapter):
+    def __init__(self, stats: HostStats, **kwargs):
+        """HTTPAdapter whose pooled connections report their setup timings"""
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self.stats
+
+        class TimedHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = _timed_connection(HTTPConnection, stats)
+
+        class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = _timed_connection(HTTPSConnection, stats)
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool
+        }
+
+class FeedHttpClient:
+    def __init__(self, timeout: Optional[float] = None, pool_maxsize: Optional[int] = None):
+        """Shared keep-alive session for feed requests"""
+        self.timeout = timeout or float(getenv('FEED_FETCH_TIMEOUT', 30))
+        self.max_bytes = int(getenv('HTTP_MAX_RESPONSE_BYTES', 10 * 1024 * 1024))
+        self.stats = HostStats()
+
+        # Retry-After is ignored: urllib3 1.26 sleeps for whatever the server
+        # asks, which can park a pool worker for hours; the exponential backoff
+        # applies instead. Read timeouts aren't retried, since each retry would
+        # add another full timeout to the fetch.
+        retries = Retry(
+            total=int(getenv('HTTP_RETRIES', 2)),
+            read=0,
+            backoff_factor=float(getenv('HTTP_BACKOFF', 0.5)),
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+        adapter = TimedHTTPAdapter(
+            self.stats,
+            pool_connections=int(getenv('HTTP_POOL_HOSTS', 100)),
+            pool_maxsize=pool_maxsize or int(getenv('HTTP_POOL_MAXSIZE', 4)),
+            max_retries=retries
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """GET a URL over the shared pool, reading at most max_bytes of body"""
+        start = time.perf_counter()
+        response = self.session.get(url, headers=headers, timeout=self.timeout, stream=True)
+        ttfb = time.perf_counter() - start
+
+        try:
+            declared = response.headers.get('Content-Length')
+            if declared and declared.isdigit() and int(declared) > self.max_bytes:
+                raise ResponseTooLarge(f"{url} declares {declared} bytes (cap {self.max_bytes})")
+
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                body.extend(chunk)
+                if len(body) > self.max_bytes:
+                    raise ResponseTooLarge(f"{url} exceeded {self.max_bytes} bytes")
+        except Exception:
+            # Drop the connection rather than return a half-read one to the pool
+            response.close()
+            raise
+        # Hand back a normal Response with its body already loaded
+        response._content = bytes(body)
+
+        self.stats.record_request(
+            urlparse(response.url or url).hostname or '',
+            ttfb,
+            time.perf_counter() - start - ttfb,
+            len(response._content)
+        )
+        return response
+
+    def log_stats(self) -> None:
+        """Log per-host connection reuse and where fetch latency went"""
+        for host, stats in sorted(self.stats.snapshot().items()):
+            requests_made = int(stats.get('requests', 0))
+            connections = int(stats.get('connections', 0))
+            logger.info(
+                f"{host}: {requests_made} requests over {connections} connections, "
+                f"tcp {stats.get('tcp_time', 0.0):.2f}s, tls {stats.get('tls_time', 0.0):.2f}s, "
+                f"ttfb {stats.get('ttfb_time', 0.0):.2f}s, download {stats.get('download_time', 0.0):.2f}s, "
+                f"{int(stats.get('bytes', 0))} bytes"
+            )
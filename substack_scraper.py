@@ -1,29 +1,135 @@
+import argparse
+import json
+import os
+import time
 import requests
 from bs4 import BeautifulSoup
 from typing import List, Dict
+import queue
 import re
 import csv
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
+from urllib.parse import urljoin
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-import time
 
-class SubstackScraper:
-    def __init__(self):
-        self.base_url = "https://substack.com"
-        self.top_news_url = "https://substack.com/top/news"  # Use absolute URL
-        
-        # Setup Chrome options
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+FEED_CONTENT_TYPES = ('xml', 'rss', 'atom')
+
+class FeedUrlCache:
+    def __init__(self, path: str = None, ttl: float = None, failed_ttl: float = None):
+        """Persistent map of publication URL -> resolved feed URL, validity and last check time."""
+        self.path = path or os.getenv('FEED_CACHE_PATH', 'feed_url_cache.json')
+        self.ttl = ttl if ttl is not None else float(os.getenv('FEED_CACHE_TTL', 7 * 86400))
+        # Dead feeds are retried sooner, since a publication may just have been down
+        self.failed_ttl = failed_ttl if failed_ttl is not None else float(os.getenv('FEED_CACHE_FAILED_TTL', 86400))
+        self.entries: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable feed cache {self.path}: {e}")
+            self.entries = {}
+
+    def save(self):
+        # Write then rename, so an interrupted run never leaves a truncated cache
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            # A read-only checkout shouldn't fail the scrape; the feeds are just rechecked next run
+            print(f"Warning: could not save feed cache {self.path}: {e}")
+
+    def get(self, publication_url: str, now: float = None) -> Dict:
+        """Return the cached entry if it hasn't expired, otherwise None."""
+        entry = self.entries.get(publication_url)
+        if entry is None:
+            return None
+        now = time.time() if now is None else now
+        ttl = self.ttl if entry['valid'] else self.failed_ttl
+        return entry if now - entry['checked_at'] < ttl else None
+
+    def put(self, publication_url: str, feed_url: str, valid: bool, now: float = None):
+        self.entries[publication_url] = {
+            'feed_url': feed_url,
+            'valid': valid,
+            'checked_at': time.time() if now is None else now
+        }
+
+class BrowserPool:
+    def __init__(self, size: int = 1, timeout: int = 10):
+        """Lazily started pool of headless Chrome drivers."""
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def _new_driver(self):
         chrome_options = webdriver.ChromeOptions()
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
+        return webdriver.Chrome(options=chrome_options)
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver, starting one if the pool isn't full yet."""
+        driver = None
+        with self._lock:
+            if self._idle.empty() and len(self._all) < self.size:
+                driver = self._new_driver()
+                self._all.append(driver)
+        if driver is None:
+            driver = self._idle.get()
+        try:
+            yield driver
+        finally:
+            self._idle.put(driver)
+
+    def close(self):
+        """Quit every driver the pool started."""
+        with self._lock:
+            for driver in self._all:
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+            self._all = []
+            self._idle = queue.Queue()
+
+class SubstackScraper:
+    def __init__(self, debug: bool = False, browser_pool_size: int = 1, http_first: bool = True,
+                 cache: FeedUrlCache = None, validate_workers: int = 8):
+        self.base_url = "https://substack.com"
+        self.top_news_url = "https://substack.com/top/news"  # Use absolute URL
+        self.max_publications = 25  # Top 25 publications
+        self.debug = debug
+        self.http_first = http_first
+        
+        # Plain HTTP is tried first; Chrome only starts if a page needs rendering
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.browsers = BrowserPool(size=browser_pool_size)
+        self.cache = cache if cache is not None else FeedUrlCache()
+        self.validate_workers = validate_workers
 
     def get_feed_url(self, publication_url: str) -> str:
         """Convert a Substack publication URL to its RSS feed URL."""
@@ -44,92 +150,176 @@ class SubstackScraper:
             # For custom domains
             return f"{publication_url}/feed"
 
-    def scrape_top_news(self) -> List[Dict]:
-        """Scrape the top news publications from Substack."""
-        try:
-            print(f"Fetching {self.top_news_url}...")
-            self.driver.get(self.top_news_url)
-            
-            # Wait for content to load
-            time.sleep(5)  # Give JavaScript time to execute
-            
-            # Save rendered HTML for debugging
-            with open('debug_rendered.html', 'w', encoding='utf-8') as f:
-                f.write(self.driver.page_source)
-            print("\nSaved rendered HTML to debug_rendered.html")
-            
-            publications = []
-            
-            # Looking for numbered publications (1. Public, 2. Whitepaper.mx, etc.)
+    def _dump_html(self, html: str, source: str, url: str):
+        """Save fetched HTML for debugging when debug mode is on."""
+        if not self.debug:
+            return
+        # One file per page and fetch, so concurrent category scrapes don't overwrite each other
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', re.sub(r'^https?://', '', url)).strip('_')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f'debug_{source}_{slug}_{timestamp}.html'
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f"Saved {source} HTML to {filename}")
+
+    def parse_publications(self, html: str, base_url: str = None) -> List[Dict]:
+        """Extract numbered publications (1. Public, 2. Whitepaper.mx, ...) from page HTML."""
+        soup = BeautifulSoup(html, 'html.parser')
+        base_url = base_url or self.base_url
+        publications = []
+        
+        for i in range(1, self.max_publications + 1):
             try:
-                print("\nLooking for numbered publications...")
-                for i in range(1, 26):  # Top 25 publications
-                    try:
-                        # Find the publication section
-                        publication_xpath = f"//*[contains(text(), '{i}. ')]"
-                        pub_elem = self.driver.find_element(By.XPATH, publication_xpath)
-                        
-                        if pub_elem:
-                            print(f"\nProcessing publication #{i}")
-                            
-                            # Get the parent element that contains all publication info
-                            parent = pub_elem.find_element(By.XPATH, "./..")
-                            
-                            # Extract title (remove the number prefix)
-                            title_text = pub_elem.text
-                            title = title_text.split('. ', 1)[1] if '. ' in title_text else title_text
-                            print(f"Found title: {title}")
-                            
-                            # Find the Subscribe link which contains the publication URL
-                            try:
-                                link_elem = parent.find_element(By.LINK_TEXT, "Subscribe")
-                                link = link_elem.get_attribute('href')
-                                print(f"Found link: {link}")
-                            except:
-                                # Try finding any link in the section
-                                link_elems = parent.find_elements(By.TAG_NAME, "a")
-                                link = link_elems[0].get_attribute('href') if link_elems else None
-                                print(f"Found alternate link: {link}")
-                            
-                            if not link:
-                                print("No link found, skipping...")
-                                continue
-                            
-                            # Try to get description from the next paragraph
-                            description = ""
-                            try:
-                                desc_elem = parent.find_element(By.TAG_NAME, "p")
-                                description = desc_elem.text.strip()
-                                print(f"Found description: {description}")
-                            except:
-                                pass
-                            
-                            # Generate RSS feed URL
-                            feed_url = self.get_feed_url(link)
-                            print(f"Generated feed URL: {feed_url}")
-                            
-                            publications.append({
-                                'title': title,
-                                'link': link,
-                                'feed_url': feed_url,
-                                'description': description
-                            })
-                            print("Successfully added publication")
-                            
-                    except Exception as e:
-                        print(f"Error processing publication #{i}: {e}")
-                        continue
+                # Find the publication section
+                marker = re.compile(rf'^\s*{i}\.\s+\S')
+                text_node = soup.find(string=marker)
+                if text_node is None:
+                    continue
+                pub_elem = text_node.parent
+                
+                # Get the parent element that contains all publication info
+                parent = pub_elem.parent or pub_elem
+                
+                # Extract title (remove the number prefix)
+                title_text = pub_elem.get_text(strip=True)
+                title = title_text.split('. ', 1)[1] if '. ' in title_text else title_text
+                
+                # Find the Subscribe link which contains the publication URL,
+                # otherwise any link in the section
+                link_elem = parent.find('a', string=re.compile(r'^\s*Subscribe\s*$')) or parent.find('a', href=True)
+                link = urljoin(base_url, link_elem['href']) if link_elem and link_elem.get('href') else None
+                if not link:
+                    print(f"No link found for publication #{i}, skipping...")
+                    continue
+                
+                # Try to get description from the next paragraph
+                desc_elem = parent.find('p')
+                description = desc_elem.get_text(strip=True) if desc_elem else ""
+                
+                publications.append({
+                    'title': title,
+                    'link': link,
+                    'feed_url': self.get_feed_url(link),
+                    'description': description
+                })
                 
             except Exception as e:
-                print(f"Error finding publications: {e}")
-            
-            return publications
-            
+                print(f"Error processing publication #{i}: {e}")
+                continue
+        
+        return publications
+
+    def _discover_http(self, url: str) -> List[Dict]:
+        """Fetch a page over plain HTTP and parse it without a browser."""
+        try:
+            response = self.session.get(url, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"HTTP fetch failed for {url}: {e}")
+            return []
+        self._dump_html(response.text, 'http', url)
+        return self.parse_publications(response.text, url)
+
+    def _discover_selenium(self, url: str) -> List[Dict]:
+        """Render a page in headless Chrome, waiting only until publications appear."""
+        with self.browsers.driver() as driver:
+            driver.get(url)
+            try:
+                # Wait for the first numbered publication instead of a fixed sleep
+                WebDriverWait(driver, self.browsers.timeout).until(
+                    EC.presence_of_element_located((By.XPATH, "//*[starts-with(normalize-space(text()), '1. ')]"))
+                )
+            except TimeoutException:
+                print(f"Timed out waiting for publications on {url}")
+            html = driver.page_source
+        self._dump_html(html, 'rendered', url)
+        
+        # One page_source read instead of dozens of find_element round-trips
+        return self.parse_publications(html, url)
+
+    def discover(self, url: str) -> List[Dict]:
+        """Discover publications on a page, using Selenium only when HTTP finds none."""
+        print(f"Fetching {url}...")
+        if self.http_first:
+            publications = self._discover_http(url)
+            if publications:
+                print(f"Found {len(publications)} publications over HTTP")
+                return publications
+            print("No publications in static HTML, falling back to Selenium")
+        publications = self._discover_selenium(url)
+        print(f"Found {len(publications)} publications with Selenium")
+        return publications
+
+    def scrape_top_news(self) -> List[Dict]:
+        """Scrape the top news publications from Substack."""
+        try:
+            return self.discover(self.top_news_url)
         except Exception as e:
             print(f"Error during scraping: {e}")
             return []
         finally:
-            self.driver.quit()
+            self.browsers.close()
+
+    def scrape_categories(self, urls: List[str]) -> List[Dict]:
+        """Scrape several category pages in parallel, de-duplicated by feed URL."""
+        publications = {}
+        try:
+            with ThreadPoolExecutor(max_workers=max(len(urls), 1)) as executor:
+                futures = {executor.submit(self.discover, url): url for url in urls}
+                for future in as_completed(futures):
+                    try:
+                        for pub in future.result():
+                            publications.setdefault(pub['feed_url'], pub)
+                    except Exception as e:
+                        print(f"Error scraping {futures[future]}: {e}")
+        finally:
+            self.browsers.close()
+        return list(publications.values())
+
+    def check_feed_url(self, feed_url: str) -> bool:
+        """Cheaply check that a feed URL responds with something feed-like."""
+        try:
+            # HEAD is enough for most hosts; some reject it, so fall back to a
+            # streamed GET and close it without reading the body
+            response = self.session.head(feed_url, timeout=5, allow_redirects=True)
+            if response.status_code in (403, 405, 501):
+                response = self.session.get(feed_url, timeout=5, stream=True)
+                response.close()
+            if response.status_code != 200:
+                return False
+            content_type = response.headers.get('Content-Type', '').lower()
+            return not content_type or any(t in content_type for t in FEED_CONTENT_TYPES)
+        except requests.RequestException:
+            return False
+
+    def validate_feeds(self, publications: List[Dict]) -> List[Dict]:
+        """Drop publications whose feed URL doesn't respond, checking only new or expired ones."""
+        pending = {}
+        for pub in publications:
+            cached = self.cache.get(pub['link'])
+            if cached is not None:
+                pub['feed_url'] = cached['feed_url']
+            elif pub['feed_url']:
+                pending[pub['link']] = pub['feed_url']
+
+        if pending:
+            print(f"Validating {len(pending)} feed URLs ({len(publications) - len(pending)} cached)...")
+            with ThreadPoolExecutor(max_workers=self.validate_workers) as executor:
+                futures = {executor.submit(self.check_feed_url, feed_url): (link, feed_url)
+                           for link, feed_url in pending.items()}
+                for future in as_completed(futures):
+                    link, feed_url = futures[future]
+                    self.cache.put(link, feed_url, future.result())
+            self.cache.save()
+
+        valid = []
+        for pub in publications:
+            entry = self.cache.get(pub['link'])
+            if entry is not None and entry['valid']:
+                valid.append(pub)
+            else:
+                print(f"Skipping unreachable feed: {pub['feed_url']}")
+        return valid
 
     def save_to_csv(self, publications: List[Dict], filename: str = None):
         """Save the scraped publications to a CSV file."""
@@ -148,8 +338,22 @@ class SubstackScraper:
             print(f"Error saving to CSV: {e}")
 
 def main():
-    scraper = SubstackScraper()
-    publications = scraper.scrape_top_news()
+    parser = argparse.ArgumentParser(description="Discover Substack publications and their feeds")
+    parser.add_argument('urls', nargs='*', help="Category pages to scrape (default: top news)")
+    parser.add_argument('--browsers', type=int, default=2, help="Headless Chrome instances for fallback rendering")
+    parser.add_argument('--selenium-only', action='store_true', help="Skip the plain HTTP attempt")
+    parser.add_argument('--debug', action='store_true', help="Save fetched HTML to debug_*.html")
+    parser.add_argument('--no-validate', action='store_true', help="Keep feed URLs without checking they respond")
+    args = parser.parse_args()
+
+    scraper = SubstackScraper(debug=args.debug, browser_pool_size=args.browsers,
+                              http_first=not args.selenium_only)
+    if args.urls:
+        publications = scraper.scrape_categories(args.urls)
+    else:
+        publications = scraper.scrape_top_news()
+    if not args.no_validate:
+        publications = scraper.validate_feeds(publications)
     
     # Print results
     print(f"\nFound {len(publications)} publications:")